@@ -1,28 +1,95 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_async_read_db, get_read_db
+from cache import TTLCache
 from config import get_settings
+from metrics import Histogram
 import models
-import bcrypt
+import passwords
+import schemas
 
 settings = get_settings()
 bearer_scheme = HTTPBearer()
 
+# token → (UserIdentity, user epoch when cached). Entries expire with the
+# token (capped by identity_cache_ttl_s) or when the user's epoch moves on.
+_identity_cache = TTLCache("identities", maxsize=settings.identity_cache_size)
+_user_epochs: Dict[int, int] = {}
+
 def hash_password(password: str) -> str:
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password=pwd_bytes, salt=salt)
-    return hashed_password.decode('utf-8')
+    """Hash in the calling thread (scripts, seeding). Request handlers use hash_password_offloaded."""
+    return passwords.hash_password(password, settings.bcrypt_rounds)
+
 
 def verify_password(plain: str, hashed: str) -> bool:
-    password_byte_enc = plain.encode('utf-8')
-    hashed_password_byte_enc = hashed.encode('utf-8')
-    return bcrypt.checkpw(password=password_byte_enc, hashed_password=hashed_password_byte_enc)
+    return passwords.verify_password(plain, hashed)
+
+
+# ── Offloaded hashing ─────────────────────────────────────────────────
+# bcrypt runs in a small dedicated process pool so a login burst can't tie up
+# the request threadpool. At most password_hash_max_pending calls may be in
+# flight (queued or running); beyond that callers get 503 + Retry-After.
+password_hash_seconds = Histogram(
+    "password_hash_seconds", "Time to hash or verify a password, including queueing", ["op"]
+)
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(settings.password_hash_max_pending)
+
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True)
+            _hash_pool = None
+
+
+def _run_hashing(op: str, fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": str(settings.password_hash_retry_after_s)},
+        )
+    start = time.perf_counter()
+    try:
+        if settings.password_hash_workers > 0:
+            return _get_hash_pool().submit(fn, *args).result()
+        return fn(*args)
+    finally:
+        _hash_slots.release()
+        password_hash_seconds.observe(time.perf_counter() - start, op)
+
+
+def hash_password_offloaded(password: str) -> str:
+    return _run_hashing("hash", passwords.hash_password, password, settings.bcrypt_rounds)
+
+
+def verify_password_offloaded(plain: str, hashed: str) -> bool:
+    return _run_hashing("verify", passwords.verify_password, plain, hashed)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -43,15 +110,85 @@ def decode_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
-    payload = decode_token(credentials.credentials)
-    user_id: int = payload.get("sub")
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached identity for this user (e.g. after deactivation)."""
+    _user_epochs[user_id] = _user_epochs.get(user_id, 0) + 1
+
+
+@event.listens_for(models.User.is_active, "set")
+def _on_is_active_set(user, value, oldvalue, initiator):
+    if not value and user.id is not None:
+        invalidate_user(user.id)
+
+
+def _cached_identity(token: str) -> Optional[schemas.UserIdentity]:
+    cached = _identity_cache.get(token)
+    if cached is not None:
+        identity, epoch = cached
+        if _user_epochs.get(identity.id, 0) == epoch:
+            return identity
+    return None
+
+
+def _load_identity(db: Session, token: str) -> schemas.UserIdentity:
+    """Verify the token, load the user and cache the resulting identity."""
+    payload = decode_token(token)
+    user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid token payload")
+    epoch = _user_epochs.get(int(user_id), 0)
     user = db.query(models.User).filter(models.User.id == int(user_id)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+
+    identity = schemas.UserIdentity.model_validate(user)
+    ttl = min(payload.get("exp", 0) - time.time(), settings.identity_cache_ttl_s)
+    if ttl > 0:
+        _identity_cache.set(token, (identity, epoch), ttl_s=ttl)
+    return identity
+
+
+def get_current_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_read_db),
+) -> schemas.UserIdentity:
+    """
+    Resolve the caller without a signature check or DB query when the token
+    was seen recently. Use get_current_user when the ORM object is needed.
+    """
+    token = credentials.credentials
+    return _cached_identity(token) or _load_identity(db, token)
+
+
+async def get_current_identity_async(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> schemas.UserIdentity:
+    """get_current_identity for async routes; a cache hit never leaves the event loop."""
+    token = credentials.credentials
+    return _cached_identity(token) or await db.run_sync(_load_identity, token)
+
+
+def get_current_user(
+    identity: schemas.UserIdentity = Depends(get_current_identity),
+    db: Session = Depends(get_read_db),
+) -> models.User:
+    user = db.query(models.User).filter(models.User.id == identity.id).first()
+    if not user or not user.is_active:
+        invalidate_user(identity.id)
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
     return user
+
+
+# ── Admin access ──────────────────────────────────────────────────────
+# Admins are named by email in ADMIN_EMAILS; there is no role column.
+ADMIN_EMAILS = frozenset(e.strip().lower() for e in settings.admin_emails.split(",") if e.strip())
+
+
+def require_admin(identity: schemas.UserIdentity = Depends(get_current_identity)) -> schemas.UserIdentity:
+    if identity.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return identity
+
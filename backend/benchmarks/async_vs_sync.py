@@ -0,0 +1,127 @@
+"""
+Throughput of the sync (threadpool + Session) and async (AsyncSession)
+database paths under concurrent load.
+
+Starts one uvicorn server per mode against the same seeded database, drives
+the hot read/write endpoints with concurrent clients and reports requests/s
+and latency percentiles for each.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.async_vs_sync [--db /tmp/bench.db] [--requests 2000] [--concurrency 64]
+
+For PostgreSQL pass --sync-url postgresql://... and --async-url
+postgresql+asyncpg://... instead of --db.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(database_url: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"server for {database_url} did not start")
+
+
+async def run_load(base_url: str, total: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        login = await client.post("/auth/login", json={"email": "demo@learn.ai", "password": "demo1234"})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        user_id = login.json()["user"]["id"]
+        quizzes = (await client.get("/quizzes")).json()
+        quiz = (await client.get(f"/quizzes/{quizzes[0]['id']}")).json()
+        answers = [0] * quiz["question_count"]
+
+        # Mostly reads, with a steady trickle of submissions
+        plan = [
+            ("GET", "/quizzes", None),
+            ("GET", f"/progress/{user_id}", None),
+            ("GET", f"/recommendations/{user_id}", None),
+            ("GET", "/attempts/my", None),
+            ("POST", "/attempts", {"quiz_id": quiz["id"], "answers": answers, "time_taken_s": 90}),
+        ]
+        latencies, errors = [], 0
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(plan[i % len(plan)])
+
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    method, path, body = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                resp = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": total,
+        "errors": errors,
+        "req_per_s": total / elapsed,
+        "p50_ms": q[49] * 1000,
+        "p95_ms": q[94] * 1000,
+        "p99_ms": q[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default="/tmp/async_vs_sync.db", help="SQLite file shared by both runs")
+    parser.add_argument("--sync-url", default=None)
+    parser.add_argument("--async-url", default=None)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sync_url = args.sync_url or f"sqlite:///{os.path.abspath(args.db)}"
+    async_url = args.async_url or f"sqlite+aiosqlite:///{os.path.abspath(args.db)}"
+
+    results = {}
+    for mode, url in (("sync", sync_url), ("async", async_url)):
+        proc = start_server(url, args.port)
+        try:
+            results[mode] = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args.requests, args.concurrency))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['req_per_s']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
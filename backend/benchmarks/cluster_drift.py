@@ -0,0 +1,77 @@
+"""
+Label drift of online cluster updates versus a full refit.
+
+Fits a model on an initial cohort, streams a later (shifted) cohort through
+ClusterModel.partial_fit in mini-batches, and compares the resulting labels
+with a MiniBatchKMeans refit over everyone.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.cluster_drift [--students 20000] [--batch 256] [--seed 7]
+"""
+import argparse
+import time
+import numpy as np
+from ml.clustering import fit_cluster_model
+
+# (avg_score mean, sd), (total_attempts mean, sd), (avg_time mean, sd) per latent group
+GROUPS = [
+    ((30, 8), (4, 2), (220, 40)),
+    ((58, 7), (12, 4), (160, 30)),
+    ((85, 6), (25, 7), (110, 25)),
+]
+
+
+def synthetic_students(n: int, rng: np.random.Generator, score_shift: float = 0.0) -> np.ndarray:
+    group = rng.choice(len(GROUPS), size=n, p=[0.35, 0.4, 0.25])
+    X = np.empty((n, 3))
+    for g, params in enumerate(GROUPS):
+        idx = group == g
+        for k, (mu, sd) in enumerate(params):
+            X[idx, k] = rng.normal(mu, sd, idx.sum())
+    X[:, 0] = np.clip(X[:, 0] + score_shift, 0, 100)
+    X[:, 1] = np.maximum(np.round(X[:, 1]), 1)
+    X[:, 2] = np.maximum(X[:, 2], 5)
+    return X
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--shift", type=float, default=6.0, help="avg_score shift of the later cohort")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    initial = synthetic_students(args.students // 2, rng)
+    later = synthetic_students(args.students - len(initial), rng, score_shift=args.shift)
+    everyone = np.vstack([initial, later])
+
+    base = fit_cluster_model(initial, random_state=args.seed)
+
+    online = base
+    t0 = time.perf_counter()
+    for start in range(0, len(later), args.batch):
+        online = online.partial_fit(later[start:start + args.batch])
+    online_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    refit = fit_cluster_model(everyone, random_state=args.seed)
+    refit_s = time.perf_counter() - t0
+
+    reference = refit.predict_many(everyone)
+    n_batches = -(-len(later) // args.batch)
+    print(f"students={len(everyone)} streamed={len(later)} batch={args.batch} shift={args.shift:+.1f}")
+    print(f"full refit:      {refit_s * 1000:8.1f} ms")
+    print(f"online updates:  {online_s * 1000:8.1f} ms total, {online_s / n_batches * 1e6:8.1f} us/batch")
+    for name, model in (("stale model", base), ("online model", online)):
+        labels = model.predict_many(everyone)
+        agreement = float(np.mean(labels == reference))
+        print(f"{name:<13} label agreement with refit: {agreement:6.2%}  (drift {1 - agreement:6.2%})")
+        for level in sorted(set(reference)):
+            mask = reference == level
+            print(f"    {level:<12} {float(np.mean(labels[mask] == level)):6.2%} of {int(mask.sum())}")
+
+
+if __name__ == "__main__":
+    main()
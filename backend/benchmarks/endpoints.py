@@ -0,0 +1,279 @@
+"""
+In-process endpoint benchmark: every router, several dataset sizes.
+
+For each size a synthetic SQLite dataset is generated once (datagen.py) and
+cached under --data-dir; every run works on a fresh copy, so the writes a
+run makes don't skew the next one. A worker process per size drives the app
+through TestClient, with no network in between, and times each endpoint:
+warm-up calls first, then --requests sequential calls against random
+users/quizzes/topics drawn with a fixed seed. Endpoints dominated by bcrypt
+(login, signup) get --auth-requests calls instead.
+
+Reported per endpoint: throughput (sequential req/s), p50/p95/p99 latency
+in ms and error responses. --output writes the JSON report. The run exits 1
+if any request got an error response, or if any p95 is more than
+--tolerance (and --min-delta-ms) slower than in --baseline, which defaults
+to the committed benchmarks/baseline.json. Refresh that file with
+--output benchmarks/baseline.json when a change is meant to move the
+numbers, or on new CI hardware; --baseline "" skips the comparison.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.endpoints [--sizes small,medium] [--requests 200]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+
+# users, topics, quizzes, attempts
+SIZES = {
+    "small": (1_000, 20, 200, 20_000),
+    "medium": (10_000, 50, 1_000, 200_000),
+    "large": (100_000, 100, 5_000, 2_000_000),
+}
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of an ascending list."""
+    return samples[min(len(samples) - 1, max(0, round(q / 100 * len(samples) + 0.5) - 1))]
+
+
+# ── Worker (one process per dataset size) ─────────────────────────────
+def _endpoints(rng, users, quizzes, topics):
+    """(name, method, path and body factory, uses the auth budget) for every route benchmarked."""
+    def user():
+        return int(rng.choice(users))
+
+    def quiz():
+        return quizzes[int(rng.integers(len(quizzes)))]
+
+    def answers(quiz_id, count):
+        return [int(a) for a in rng.integers(0, 4, count)]
+
+    signups = iter(range(10**9))
+
+    def submit():
+        quiz_id, count = quiz()
+        return "/attempts", {"quiz_id": quiz_id, "answers": answers(quiz_id, count), "time_taken_s": 120}
+
+    def batch():
+        items = []
+        for _ in range(10):
+            quiz_id, count = quiz()
+            items.append({"quiz_id": quiz_id, "answers": answers(quiz_id, count), "time_taken_s": 90})
+        return "/attempts/batch", {"attempts": items}
+
+    return [
+        ("POST /auth/login", "POST", lambda: ("/auth/login", {"email": "demo@learn.ai", "password": "demo1234"}), True),
+        ("POST /auth/signup", "POST", lambda: ("/auth/signup", {
+            "name": "Bench", "email": f"bench{time.time_ns()}-{next(signups)}@bench.example.com", "password": "bench1234"}), True),
+        ("GET /auth/me", "GET", lambda: ("/auth/me", None), False),
+        ("GET /topics", "GET", lambda: ("/topics", None), False),
+        ("GET /topics/{id}", "GET", lambda: (f"/topics/{int(rng.choice(topics))}", None), False),
+        ("GET /quizzes", "GET", lambda: ("/quizzes", None), False),
+        ("GET /quizzes?topic_id", "GET", lambda: (f"/quizzes?topic_id={int(rng.choice(topics))}", None), False),
+        ("GET /quizzes/{id}", "GET", lambda: (f"/quizzes/{quiz()[0]}", None), False),
+        ("POST /attempts", "POST", submit, False),
+        ("POST /attempts/batch (10)", "POST", batch, False),
+        ("GET /attempts/my", "GET", lambda: ("/attempts/my", None), False),
+        ("GET /progress/{id}", "GET", lambda: (f"/progress/{user()}", None), False),
+        ("GET /recommendations/{id}", "GET", lambda: (f"/recommendations/{user()}", None), False),
+        ("GET /recommendations/history/{id}", "GET", lambda: (f"/recommendations/history/{user()}", None), False),
+        ("GET /analytics/quizzes/{id}/pct", "GET",
+         lambda: (f"/analytics/quizzes/{quiz()[0]}/percentiles?score=70&time_taken_s=300", None), False),
+    ]
+
+
+def prepare(size):
+    """Migrate, seed the demo user and append the synthetic dataset for `size`."""
+    import datagen
+    import migrate
+    from database import engine
+
+    migrate.init_database()
+    users, topics, quizzes, attempts = SIZES[size]
+    datagen.generate(engine, datagen.DatasetSpec(users=users, topics=topics, quizzes=quizzes, attempts=attempts))
+
+
+def worker(requests, auth_requests, warmup, seed):
+    import numpy as np
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+    from auth import create_access_token
+    from database import SessionLocal
+    import main
+    import models
+
+    with SessionLocal() as db:
+        users = db.execute(select(models.User.id)).scalars().all()
+        topics = db.execute(select(models.Topic.id)).scalars().all()
+        quizzes = db.execute(
+            select(models.Question.quiz_id, func.count(models.Question.id)).group_by(models.Question.quiz_id)
+        ).all()
+        demo_id = db.execute(select(models.User.id).where(models.User.email == "demo@learn.ai")).scalar()
+    quizzes = [(int(q), int(n)) for q, n in quizzes]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(demo_id)})}"}
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    with TestClient(main.app) as client:
+        for name, method, build, is_auth in _endpoints(rng, users, quizzes, topics):
+            n = auth_requests if is_auth else requests
+            samples, errors = [], 0
+            for i in range(min(warmup, n) + n):
+                path, body = build()
+                start = time.perf_counter()
+                resp = client.request(method, path, json=body, headers=headers)
+                elapsed = time.perf_counter() - start
+                if i < min(warmup, n):
+                    continue
+                samples.append(elapsed)
+                errors += resp.status_code >= 400
+            samples.sort()
+            results[name] = {
+                "requests": n,
+                "errors": errors,
+                "throughput_rps": n / sum(samples),
+                "p50_ms": percentile(samples, 50) * 1e3,
+                "p95_ms": percentile(samples, 95) * 1e3,
+                "p99_ms": percentile(samples, 99) * 1e3,
+            }
+    print(json.dumps(results))
+
+
+# ── Driver ────────────────────────────────────────────────────────────
+def _spawn(db_path, *args):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    cmd = [sys.executable, "-m", "benchmarks.endpoints", *args]
+    return subprocess.run(cmd, cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+
+
+def run_size(args, size):
+    os.makedirs(args.data_dir, exist_ok=True)
+    cached = os.path.abspath(os.path.join(args.data_dir, f"{size}.db"))
+    if not os.path.exists(cached + ".ok"):
+        print(f"Generating {size} dataset in {cached} ...")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cached + suffix):
+                os.remove(cached + suffix)
+        _spawn(cached, "--prepare", size)
+        open(cached + ".ok", "w").close()
+
+    # The backup API copies a WAL database consistently, unlike a file copy
+    scratch = os.path.abspath(os.path.join(args.data_dir, f"{size}-run.db"))
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(scratch + suffix):
+            os.remove(scratch + suffix)
+    with sqlite3.connect(cached) as src, sqlite3.connect(scratch) as dst:
+        src.backup(dst)
+
+    out = _spawn(
+        scratch, "--worker", "--requests", str(args.requests), "--auth-requests", str(args.auth_requests),
+        "--warmup", str(args.warmup), "--seed", str(args.seed),
+    )
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def compare(report, baseline, tolerance, min_delta_ms):
+    """Print p95 deltas against the baseline; return the (size, endpoint) pairs that regressed."""
+    regressions = []
+    print(f"\n{'size':<7} {'endpoint':<34} {'base p95':>9} {'p95':>9} {'delta':>8}")
+    for size, endpoints in report["results"].items():
+        for name, r in endpoints.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            delta = r["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+            # Sub-millisecond p95s jitter by more than the tolerance, hence the absolute floor
+            slower = delta > tolerance and r["p95_ms"] - base["p95_ms"] > min_delta_ms
+            flag = "  REGRESSION" if slower else ""
+            print(f"{size:<7} {name:<34} {base['p95_ms']:>9.2f} {r['p95_ms']:>9.2f} {delta:>+7.0%}{flag}")
+            if flag:
+                regressions.append((size, name))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="small,medium", help=f"comma-separated subset of {', '.join(SIZES)}")
+    parser.add_argument("--requests", type=int, default=200, help="timed calls per endpoint")
+    parser.add_argument("--auth-requests", type=int, default=10, help="timed calls for bcrypt-bound endpoints")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7, help="seed for request targets")
+    parser.add_argument("--data-dir", default=os.path.join(BACKEND_DIR, "benchmarks", ".data"),
+                        help="where generated datasets are cached")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", default=BASELINE, help="earlier JSON report to compare against ('' to skip)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown, as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=0.25, help="p95 slowdowns below this never count")
+    parser.add_argument("--prepare", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child processes; DATABASE_URL was set by the driver
+    if args.prepare:
+        prepare(args.prepare)
+        return
+    if args.worker:
+        worker(args.requests, args.auth_requests, args.warmup, args.seed)
+        return
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "auth_requests": args.auth_requests,
+            "sizes": {s: dict(zip(("users", "topics", "quizzes", "attempts"), SIZES[s])) for s in sizes},
+        },
+        "results": {},
+    }
+    for size in sizes:
+        report["results"][size] = results = run_size(args, size)
+        print(f"\n{size}: {SIZES[size][3]:,} attempts, {SIZES[size][0]:,} users")
+        print(f"{'endpoint':<34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+        for name, r in results.items():
+            print(f"{name:<34} {r['throughput_rps']:>8.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                  f"{r['p99_ms']:>8.2f} {r['errors']:>6}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    errors = [(size, name, r["errors"]) for size, results in report["results"].items()
+              for name, r in results.items() if r["errors"]]
+    if errors:
+        print(f"\n{len(errors)} endpoint(s) returned errors:", file=sys.stderr)
+        for size, name, count in errors:
+            print(f"  {size} {name}: {count}", file=sys.stderr)
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Attempt export: streamed chunks vs materialising the result.
+
+Runs against the database in DATABASE_URL (fill it first with
+`python manage.py generate-data`). For growing row counts it times each
+strategy and records its peak Python heap (tracemalloc, measured in a
+separate pass so tracing doesn't skew the timings):
+
+    materialised  .all() into a list, then encode everything (the
+                  list-building pattern of /attempts/my, scaled up)
+    streamed      export.iter_attempts with a server-side cursor
+
+The streamed peak should stay flat as rows grow; the materialised one
+grows linearly.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.export_stream [--rows 10000,50000,200000] [--format ndjson] [--chunk-size 2000]
+"""
+import argparse
+import time
+import tracemalloc
+from database import ReadSessionLocal
+import export
+
+
+def materialised(db, fmt, limit, chunk_size):
+    rows = db.execute(export.attempts_query(limit=limit)).all()
+    body = export._csv_chunk(rows, header=True) if fmt == "csv" else export._ndjson_chunk(rows)
+    return len(rows), len(body)
+
+
+def streamed(db, fmt, limit, chunk_size):
+    size = 0
+    for chunk in export.iter_attempts(db, fmt, limit=limit, chunk_size=chunk_size):
+        size += len(chunk)
+    return None, size
+
+
+def measure(fn, fmt, limit, chunk_size, traced):
+    db = ReadSessionLocal()
+    try:
+        if traced:
+            tracemalloc.start()
+        start = time.perf_counter()
+        _, size = fn(db, fmt, limit, chunk_size)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if traced else 0
+        return seconds, size, peak
+    finally:
+        if traced:
+            tracemalloc.stop()
+        db.close()
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", default="10000,50000,200000", help="comma-separated export sizes")
+    parser.add_argument("--format", choices=sorted(export.FORMATS), default="ndjson")
+    parser.add_argument("--chunk-size", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'strategy':<13} {'seconds':>8} {'rows/s':>10} {'MB out':>8} {'peak MB':>8}")
+    for limit in (int(s) for s in args.rows.split(",")):
+        for name, fn in (("materialised", materialised), ("streamed", streamed)):
+            seconds, size, _ = measure(fn, args.format, limit, args.chunk_size, traced=False)
+            _, _, peak = measure(fn, args.format, limit, args.chunk_size, traced=True)
+            print(f"{limit:>8} {name:<13} {seconds:>8.2f} {limit / seconds:>10,.0f} "
+                  f"{size / 1e6:>8.1f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,99 @@
+"""
+Quiz list serialisation cost per item: response_model vs the fast JSON path.
+
+Builds N in-memory quizzes (no database) and times turning them into a
+response body:
+
+    response_model   QuizOut objects through FastAPI's response_model
+                     validation + JSONResponse (the previous path)
+    dump_json        QuizOut objects via a pydantic TypeAdapter, no revalidation
+    fast (orjson)    plain dicts through fastjson.dumps with orjson
+    fast (stdlib)    the same with the stdlib fallback encoder
+    cached bytes     what list_quizzes does once the catalog snapshot is warm
+
+Usage (from the backend/ directory):
+    python -m benchmarks.serialization [--sizes 100,1000,10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+import fastjson
+import schemas
+
+
+def make_quizzes(n):
+    topics = [
+        {"id": t, "name": f"Topic {t}", "description": "Generated topic", "category": "Programming"}
+        for t in range(1, 51)
+    ]
+    return [
+        {
+            "id": i,
+            "title": f"Quiz {i}: a reasonably descriptive title",
+            "topic_id": topics[i % 50]["id"],
+            "topic": topics[i % 50],
+            "difficulty_level": ("Beginner", "Intermediate", "Advanced")[i % 3],
+            "description": "Covers the basics of the topic in ten questions.",
+            "question_count": 10,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20, help="timings per strategy; the best is kept")
+    args = parser.parse_args()
+
+    field = create_response_field(name="Response_list_quizzes", type_=List[schemas.QuizOut])
+    adapter = TypeAdapter(List[schemas.QuizOut])
+    orjson = fastjson.orjson
+
+    print(f"{'quizzes':>8} {'strategy':<16} {'total ms':>9} {'µs/item':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        dicts = make_quizzes(n)
+        models = [schemas.QuizOut(**d) for d in dicts]
+
+        def response_model():
+            content = asyncio.run(serialize_response(field=field, response_content=models, is_coroutine=False))
+            return JSONResponse(content).body
+
+        def stdlib():
+            fastjson.orjson = None
+            try:
+                return fastjson.dumps(dicts)
+            finally:
+                fastjson.orjson = orjson
+
+        cached = fastjson.dumps(dicts)
+        strategies = [
+            ("response_model", response_model),
+            ("dump_json", lambda: adapter.dump_json(models)),
+            ("fast (stdlib)", stdlib),
+            ("cached bytes", lambda: fastjson.FastJSONResponse(cached).body),
+        ]
+        if orjson is not None:
+            strategies.insert(2, ("fast (orjson)", lambda: fastjson.dumps(dicts)))
+
+        for name, fn in strategies:
+            seconds = best_of(fn, args.repeat)
+            print(f"{n:>8} {name:<16} {seconds * 1e3:>9.2f} {seconds * 1e6 / n:>8.2f}")
+
+
+if __name__ == "__main__":
+    run()
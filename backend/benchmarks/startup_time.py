@@ -0,0 +1,109 @@
+"""
+API startup time: interpreter launch to a ready app, in fresh processes.
+
+Each run spawns a new Python process that imports main and enters the app's
+lifespan (what uvicorn does before it accepts connections). Runs
+come in two flavours:
+
+    cold   empty database: migrations and seeding run
+    warm   database already initialised: init_database() skips straight through
+
+The child also reports whether numpy/sklearn/scipy got imported; none of
+them should be on the startup path.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.startup_time [--runs 10] [--json] [--max-warm-s 1.0]
+
+With --max-warm-s the script exits 1 when the warm p50 exceeds the budget,
+so it can gate CI; tests/test_startup.py applies WARM_BUDGET_S the same
+way.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "scipy", "sklearn")
+WARM_BUDGET_S = 1.0  # warm p50 wall time the test suite holds startup to
+
+CHILD = f"""
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def enter_lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()  # ready; shutdown isn't timed
+
+ready = asyncio.run(enter_lifespan())
+print(json.dumps({{
+    "import_s": imported - start,
+    "startup_s": ready - imported,
+    "heavy_modules": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def spawn(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True, text=True,
+    ).stdout
+    wall = time.perf_counter() - start
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall_s"] = wall
+    return result
+
+
+def summarise(samples):
+    walls = sorted(s["wall_s"] for s in samples)
+    return {
+        "runs": len(samples),
+        "wall_p50_s": walls[len(walls) // 2],
+        "wall_max_s": walls[-1],
+        "import_mean_s": statistics.fmean(s["import_s"] for s in samples),
+        "startup_mean_s": statistics.fmean(s["startup_s"] for s in samples),
+        "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="processes per flavour")
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    parser.add_argument("--max-warm-s", type=float, default=None, help="fail if warm p50 wall time exceeds this")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="startup_time_")
+    cold, warm = [], []
+    for i in range(args.runs):
+        cold.append(spawn(f"sqlite:///{os.path.join(tmp, f'cold-{i}.db')}"))
+    warm_url = f"sqlite:///{os.path.join(tmp, 'warm.db')}"
+    spawn(warm_url)  # initialise once
+    for _ in range(args.runs):
+        warm.append(spawn(warm_url))
+
+    report = {"cold": summarise(cold), "warm": summarise(warm)}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'':<6} {'p50 wall s':>10} {'max s':>7} {'import s':>9} {'startup s':>10}  heavy modules")
+        for name, r in report.items():
+            print(f"{name:<6} {r['wall_p50_s']:>10.3f} {r['wall_max_s']:>7.3f} {r['import_mean_s']:>9.3f} "
+                  f"{r['startup_mean_s']:>10.3f}  {', '.join(r['heavy_modules']) or '-'}")
+
+    if args.max_warm_s is not None and report["warm"]["wall_p50_s"] > args.max_warm_s:
+        print(f"warm startup p50 {report['warm']['wall_p50_s']:.3f}s exceeds {args.max_warm_s:.3f}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,118 @@
+"""
+Attempt submission latency: ORM question scoring vs compiled answer keys.
+
+Runs against a throwaway SQLite database seeded with the demo data. For each
+strategy it times the scoring step alone and the full POST /attempts call
+through the app:
+
+    orm         load the Quiz and its Question rows, compare in Python (previous path)
+    key-cold    compiled key, cache cleared before every call (one narrow query)
+    key-cached  compiled key served from answer_key_cache (no question query)
+
+Usage (from the backend/ directory):
+    python -m benchmarks.submit_latency [--iterations 2000] [--questions 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="submit_latency_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+import main  # noqa: E402
+import migrate  # noqa: E402
+import models  # noqa: E402
+import scoring  # noqa: E402
+from cache import answer_key_cache  # noqa: E402
+from database import SessionLocal  # noqa: E402
+
+
+def orm_score(db, quiz_id, answers):
+    quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+    questions = quiz.questions
+    return sum(1 for q, a in zip(questions, answers) if q.correct_answer == a)
+
+
+def key_score(db, quiz_id, answers):
+    key = scoring.get_answer_key(db, quiz_id)
+    return int(scoring.score_answers(key, [answers])[0])
+
+
+def add_quiz(db, n_questions):
+    quiz = models.Quiz(title=f"Benchmark quiz ({n_questions} questions)", topic_id=1, difficulty_level="Beginner")
+    db.add(quiz)
+    db.flush()
+    for i in range(n_questions):
+        db.add(models.Question(quiz_id=quiz.id, text=f"Q{i}", options_json='["a","b","c","d"]',
+                               correct_answer=i % 4))
+    db.commit()
+    return quiz.id
+
+
+def time_calls(fn, iterations, before=None):
+    samples = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=5, help="questions in the benchmark quiz")
+    args = parser.parse_args()
+
+    migrate.init_database()
+    db = SessionLocal()
+    quiz_id = add_quiz(db, args.questions)
+    answers = [i % 3 for i in range(args.questions)]
+    assert orm_score(db, quiz_id, answers) == key_score(db, quiz_id, answers)
+
+    def fresh(fn):
+        def call():
+            db.expire_all()  # as in a new request session
+            fn(db, quiz_id, answers)
+        return call
+
+    rows = [
+        ("orm", time_calls(fresh(orm_score), args.iterations)),
+        ("key-cold", time_calls(fresh(key_score), args.iterations, before=answer_key_cache.clear)),
+        ("key-cached", time_calls(fresh(key_score), args.iterations)),
+    ]
+    db.close()
+
+    client = TestClient(main.app)
+    token = client.post("/auth/login", json={"email": "demo@learn.ai", "password": "demo1234"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"quiz_id": quiz_id, "answers": answers, "time_taken_s": 60}
+
+    def submit():
+        resp = client.post("/attempts", json=body, headers=headers)
+        assert resp.status_code == 200, resp.text
+
+    requests = max(args.iterations // 4, 50)
+    rows += [
+        ("POST key-cold", time_calls(submit, requests, before=answer_key_cache.clear)),
+        ("POST key-cached", time_calls(submit, requests)),
+    ]
+
+    print(f"{args.questions}-question quiz, {args.iterations} scoring calls, {requests} submissions")
+    print(f"{'strategy':<16} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for name, r in rows:
+        print(f"{name:<16} {r['mean_us']:>9.1f} {r['p50_us']:>9.1f} {r['p99_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    run()
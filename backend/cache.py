@@ -0,0 +1,100 @@
+"""
+Small in-process caches.
+
+TTLCache is a thread-safe LRU with a per-entry time-to-live and hit/miss
+counters. Each worker process has its own copy, so entries are bounded by
+their TTL across workers and invalidated explicitly within one.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from config import get_settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl_s: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or (entry[1] is not None and entry[1] <= now):
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl_s: Optional[float] = None) -> None:
+        """Store `value`; `ttl_s` overrides the cache default for this entry."""
+        ttl = self.ttl_s if ttl_s is None else ttl_s
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ── Shared caches ─────────────────────────────────────────────────────
+_settings = get_settings()
+
+# student_id → schemas.RecommendationOut; dropped on new attempts and new topics
+recommendation_cache = TTLCache(
+    "recommendations",
+    maxsize=_settings.recommendation_cache_size,
+    ttl_s=_settings.recommendation_cache_ttl_s,
+)
+
+# quiz_id → (json bytes, etag) of the public quiz detail; dropped when a
+# quiz, its questions or its topic change
+quiz_detail_cache = TTLCache(
+    "quiz_detail",
+    maxsize=_settings.quiz_detail_cache_size,
+    ttl_s=_settings.quiz_detail_cache_ttl_s,
+)
+
+# quiz_id → scoring.AnswerKey; dropped when a quiz or its questions change
+answer_key_cache = TTLCache(
+    "answer_keys",
+    maxsize=_settings.answer_key_cache_size,
+    ttl_s=_settings.answer_key_cache_ttl_s,
+)
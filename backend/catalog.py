@@ -0,0 +1,132 @@
+"""
+Process-wide cache of the topic/quiz catalog.
+
+The catalog changes only when a topic or quiz is created, so listings are
+served from an immutable in-memory snapshot. create_topic/create_quiz call
+bump() to advance the version, and the next reader rebuilds the snapshot
+with three queries. Other worker processes pick changes up once their
+snapshot is older than CATALOG_TTL_S.
+
+Entries are plain dicts in the TopicOut/QuizOut field order, built straight
+from row tuples, and each listing's JSON body is encoded once per snapshot.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import get_settings
+from fastjson import dumps
+import models
+
+
+class CatalogSnapshot:
+    def __init__(self, version: int, topics: List[dict], quizzes: List[dict]):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.topics = topics
+        self.topics_by_id: Dict[int, dict] = {t["id"]: t for t in topics}
+        self.topic_refs = [{"id": t["id"], "name": t["name"]} for t in topics]
+        self.quizzes = quizzes
+        self.quizzes_by_id: Dict[int, dict] = {q["id"]: q for q in quizzes}
+
+        # (topic_id | None, difficulty | None) → quizzes in id order
+        self._index: Dict[Tuple[Optional[int], Optional[str]], List[dict]] = {}
+        for quiz in quizzes:
+            for key in (
+                (None, None),
+                (quiz["topic_id"], None),
+                (None, quiz["difficulty_level"]),
+                (quiz["topic_id"], quiz["difficulty_level"]),
+            ):
+                self._index.setdefault(key, []).append(quiz)
+        self._topics_json: Optional[bytes] = None
+        self._quizzes_json: Dict[Tuple[Optional[int], Optional[str]], bytes] = {}
+
+    def find_quizzes(self, topic_id: Optional[int] = None, difficulty: Optional[str] = None) -> List[dict]:
+        return self._index.get((topic_id or None, difficulty or None), [])
+
+    def quizzes_json(self, topic_id: Optional[int] = None, difficulty: Optional[str] = None) -> bytes:
+        """find_quizzes() as a JSON body, encoded on first use."""
+        key = (topic_id or None, difficulty or None)
+        body = self._quizzes_json.get(key)
+        if body is None:
+            body = self._quizzes_json[key] = dumps(self._index.get(key, []))
+        return body
+
+    def topics_json(self) -> bytes:
+        if self._topics_json is None:
+            self._topics_json = dumps(self.topics)
+        return self._topics_json
+
+
+class Catalog:
+    def __init__(self):
+        self._version = 1
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        """Mark the catalog as changed; the next get() reloads it."""
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+            return self._version
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == self._version
+            and time.monotonic() - snapshot.loaded_at < get_settings().catalog_ttl_s
+        )
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = _load(db, self._version)
+            return self._snapshot
+
+
+def _load(db: Session, version: int) -> CatalogSnapshot:
+    topic = models.Topic
+    topics = [
+        {"id": id_, "name": name, "description": description, "category": category}
+        for id_, name, description, category in db.execute(
+            select(topic.id, topic.name, topic.description, topic.category).order_by(topic.id)
+        )
+    ]
+    topics_by_id = {t["id"]: t for t in topics}
+
+    question_counts = dict(
+        db.execute(
+            select(models.Question.quiz_id, func.count(models.Question.id))
+            .group_by(models.Question.quiz_id)
+        ).all()
+    )
+    quiz = models.Quiz
+    quizzes = [
+        {
+            "id": id_,
+            "title": title,
+            "topic_id": topic_id,
+            "topic": topics_by_id.get(topic_id),
+            "difficulty_level": difficulty_level,
+            "description": description,
+            "question_count": question_counts.get(id_, 0),
+        }
+        for id_, title, topic_id, difficulty_level, description in db.execute(
+            select(quiz.id, quiz.title, quiz.topic_id, quiz.difficulty_level, quiz.description)
+            .order_by(quiz.id)
+        )
+    ]
+    return CatalogSnapshot(version, topics, quizzes)
+
+
+catalog = Catalog()
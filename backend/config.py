@@ -1,12 +1,86 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./learningdb.db"
+    database_read_url: str = ""  # optional replica for read-only routes; empty uses the primary
+    init_db_on_startup: bool = True  # migrate + seed at startup; skipped once at head and seeded
+
+    # Connection pooling (ignored for in-memory SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_s: float = 30.0
+    db_pool_recycle_s: int = 1800  # drop connections before server-side idle timeouts
+    db_pool_pre_ping: bool = True
+
+    # SQLite pragmas, applied to every new connection
+    sqlite_wal: bool = True  # readers no longer block the writer
+    sqlite_synchronous: str = "NORMAL"  # durable across app crashes; safe with WAL
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_begin_immediate: bool = True  # sync writer takes the lock up front instead of failing on upgrade
+
+    admin_emails: str = ""  # comma-separated accounts allowed on /admin routes (data exports)
     secret_key: str = "supersecretkey-change-in-production-2024"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24 hours
+    identity_cache_size: int = 10_000
+    identity_cache_ttl_s: float = 300.0  # cap, so deactivations reach every worker
+
+    # Password hashing
+    bcrypt_rounds: int = 12  # work factor for new hashes; existing hashes keep theirs
+    password_hash_workers: int = 2  # dedicated processes; 0 hashes in the request thread
+    password_hash_max_pending: int = 16  # in-flight hashes before answering 503
+    password_hash_retry_after_s: int = 2
+
+    # Topic/quiz catalog snapshot; bounds staleness across worker processes
+    catalog_ttl_s: float = 60.0
+    quiz_detail_cache_size: int = 2_000  # pre-serialised quiz detail bodies
+    quiz_detail_cache_ttl_s: float = 300.0  # bounds staleness after edits made by other workers
+
+    # Attempt submission
+    attempt_batch_max: int = 500  # items per POST /attempts/batch
+    attempt_clock_skew_s: float = 300.0  # how far ahead of receipt an offline attempted_at may be
+    answer_key_cache_size: int = 5_000  # compiled per-quiz answer keys
+    answer_key_cache_ttl_s: float = 300.0  # bounds staleness after edits made by other workers
+
+    # History lists (keyset pagination)
+    page_size_max: int = 100
+    attempts_page_size: int = 50
+    recommendation_history_page_size: int = 10
+    progress_recent_attempts: int = 10
+
+    # Mastery (time-decayed average score per user and topic); after changing
+    # the half-life, rebuild with `python manage.py backfill-stats`
+    mastery_half_life_days: float = Field(30.0, gt=0)
+
+    # Per-user recommendation cache
+    recommendation_cache_size: int = 10_000
+    recommendation_cache_ttl_s: float = 300.0
+
+    # Recommendation history persistence
+    recommendation_dedupe: bool = True  # skip rows identical to the user's latest
+    recommendation_write_behind: bool = True  # insert via the background bulk writer
+    recommendation_flush_interval_s: float = 2.0
+    recommendation_flush_batch: int = 500
+
+    # Student clustering model (written by `manage.py fit-clusters`)
+    cluster_model_path: str = "./artifacts/student_clusters.json"
+    cluster_model_reload_s: float = 5.0  # how often workers check for a new model
+    cluster_batch_size: int = 1024
+    cluster_online_updates: bool = True  # fold new attempts into the model between refits
+    cluster_online_batch_size: int = 256  # students waiting before a fold runs early
+    cluster_online_flush_s: float = 60.0
+
+    # Admin data exports (/admin/exports, `manage.py export-attempts`)
+    export_chunk_size: int = 2_000  # rows fetched per server-side cursor round trip
+
+    # Request metrics (/metrics) and slow-request logging
+    metrics_enabled: bool = True
+    slow_request_ms: float = 500.0
+    slow_request_queries: int = 25  # also log requests running more queries than this
 
     class Config:
         env_file = ".env"
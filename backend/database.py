@@ -1,23 +1,202 @@
-from sqlalchemy import create_engine
+import math
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, object_session, sessionmaker
 from config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-)
+# DATABASE_URL selects the mode: an async driver (sqlite+aiosqlite://,
+# postgresql+asyncpg://) serves the hot routers from AsyncSession. A sync
+# engine on the dialect's default driver is always available for scripts,
+# background writers and the remaining routes.
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+_url = make_url(settings.database_url)
+ASYNC_MODE = _url.get_driver_name() in ASYNC_DRIVERS.values()
+# DATABASE_READ_URL points read-only routes at a replica; writes always go
+# to the primary.
+_read_url = make_url(settings.database_read_url) if settings.database_read_url else None
+
+
+def _sync_url(url: URL) -> URL:
+    if url.get_driver_name() in ASYNC_DRIVERS.values():
+        return url.set(drivername=url.get_backend_name())
+    return url
+
+
+def _async_url(url: URL) -> URL:
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_kwargs(url: URL) -> dict:
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_s,
+            pool_recycle=settings.db_pool_recycle_s,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    return kwargs
+
+
+def _configure_sqlite(engine: Engine, url: URL, begin_immediate: bool = False) -> None:
+    if url.get_backend_name() != "sqlite":
+        return
+    pragmas = [
+        f"busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"synchronous={settings.sqlite_synchronous}",
+        f"mmap_size={settings.sqlite_mmap_size}",
+    ]
+    if settings.sqlite_wal and not _is_memory_sqlite(url):
+        pragmas.insert(0, "journal_mode=WAL")
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        if begin_immediate:
+            dbapi_connection.isolation_level = None  # let the "begin" hook issue BEGIN
+        # The mastery upsert (stats.py) needs power(); not every SQLite build has math functions
+        dbapi_connection.create_function("power", 2, math.pow, deterministic=True)
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    if begin_immediate:
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _create_engine(url: URL, writer: bool = True) -> Engine:
+    url = _sync_url(url)
+    engine = create_engine(url, **_engine_kwargs(url))
+    # A deferred transaction that reads and then writes fails at once with
+    # "database is locked" if another writer committed in between; busy_timeout
+    # can't help there, so the writer engine takes the lock up front.
+    _configure_sqlite(engine, url, begin_immediate=writer and settings.sqlite_begin_immediate)
+    return engine
+
+
+def _needs_read_engine(url: URL) -> bool:
+    # SQLite readers get their own (deferred) engine on the same file so they
+    # never queue behind BEGIN IMMEDIATE writers
+    return _read_url is not None or (url.get_backend_name() == "sqlite" and not _is_memory_sqlite(url))
+
+
+engine = _create_engine(_url)
+read_engine = _create_engine(_read_url or _url, writer=False) if _needs_read_engine(_url) else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 
+# ── Commit hooks ──────────────────────────────────────────────────────
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def call_after_commit(instance, fn, *args) -> None:
+    """
+    Run fn(*args) once the session holding `instance` commits; dropped if it
+    rolls back, and deduplicated per transaction. Mapper events fire during
+    flush, so cache invalidation done there would let a concurrent reader
+    re-cache the old rows before the commit lands.
+    """
+    session = object_session(instance)
+    if session is None:
+        fn(*args)
+        return
+    session.info.setdefault(_AFTER_COMMIT, {})[(fn, args)] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for fn, args in session.info.pop(_AFTER_COMMIT, {}):
+        fn(*args)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session):
+    session.info.pop(_AFTER_COMMIT, None)
+
+
 def get_db():
+    """
+    Session for routes that write. On SQLite its first statement takes the
+    write lock (BEGIN IMMEDIATE), so read-only routes use get_read_db, and
+    writers end the transaction before any slow non-DB work.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only routes; served by the replica when one is configured."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ── Async path ────────────────────────────────────────────────────────
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    def _create_async_engine(url: URL):
+        url = _async_url(url)
+        kwargs = _engine_kwargs(url)
+        if "pool_size" in kwargs:
+            # aiosqlite defaults to NullPool; keep connections (and their pragmas) pooled
+            kwargs["poolclass"] = AsyncAdaptedQueuePool
+        created = create_async_engine(url, **kwargs)
+        # No BEGIN IMMEDIATE here: the lock would be held across event-loop
+        # turns and stall every other writer on the loop
+        _configure_sqlite(created.sync_engine, url)
+        return created
+
+    async_engine = _create_async_engine(_url)
+    async_read_engine = (
+        _create_async_engine(_read_url or _url) if _needs_read_engine(_url) else async_engine
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+def all_engines() -> list:
+    """Distinct sync engines behind every session factory (async ones via .sync_engine)."""
+    engines = [engine, read_engine]
+    if ASYNC_MODE:
+        engines += [async_engine.sync_engine, async_read_engine.sync_engine]
+    return list(dict.fromkeys(engines))
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,260 @@
+"""
+Synthetic dataset generator for load and capacity testing.
+
+Produces users, topics, quizzes, questions and quiz attempts at production
+volumes (run via `python manage.py generate-data`). Everything is drawn from
+one seeded numpy Generator and timestamps are laid out back from a fixed
+spec.now, so the same spec gives the same rows.
+
+Distributions:
+    attempts per user   multinomial over log-normal activity weights, so a
+                        few heavy users and a long tail of light ones
+    quiz popularity     Zipf-like over a shuffled quiz order
+    correctness         per question, P = sigmoid(ability - difficulty + 1),
+                        ability ~ N(0, 1) per user, difficulty from the
+                        quiz's level plus noise; wrong answers pick another option
+    time taken          log-normal around 25 s per question
+    attempted_at        uniform between the user's sign-up and spec.now
+
+Rows go in chunk by chunk, each chunk in its own transaction: COPY on
+PostgreSQL (psycopg2), executemany elsewhere. New rows are appended after
+the current max ids, and user_topic_stats and distribution_buckets are
+rebuilt at the end.
+Synthetic users share the password LOAD_TEST_PASSWORD so load tests can
+log in as any of them.
+"""
+import csv
+import io
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from auth import hash_password
+import distributions
+import models
+import stats
+
+LOAD_TEST_PASSWORD = "loadtest"
+EMAIL_DOMAIN = "loadtest.example.com"  # .test is rejected by EmailStr
+CATEGORIES = ["Programming", "AI/ML", "Data Science", "Web", "Databases", "Mathematics", "Systems"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+LEVEL_WEIGHTS = [0.4, 0.4, 0.2]
+LEVEL_DIFFICULTY = [-0.8, 0.0, 0.8]
+OPTIONS_JSON = json.dumps(["Option A", "Option B", "Option C", "Option D"])
+
+
+class DatasetSpec(NamedTuple):
+    users: int = 1_000
+    topics: int = 50
+    quizzes: int = 500
+    attempts: int = 20_000
+    min_questions: int = 5
+    max_questions: int = 15
+    days: int = 180  # sign-ups and attempts spread over this many days
+    now: datetime = datetime(2025, 1, 1)  # end of that window (naive UTC)
+    seed: int = 42
+    chunk_size: int = 10_000  # rows per insert transaction
+
+
+# ── Bulk insert ───────────────────────────────────────────────────────
+def _use_copy(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+
+
+def _copy(conn: Connection, table, columns: Sequence[str], rows: List[tuple]) -> None:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(engine: Engine, table, columns: Sequence[str], rows: List[tuple], chunk_size: int) -> None:
+    """Insert `rows` (tuples in `columns` order), one transaction per chunk."""
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        with engine.begin() as conn:
+            if _use_copy(conn):
+                _copy(conn, table, columns, chunk)
+            else:
+                conn.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+
+
+def _next_id(engine: Engine, model) -> int:
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(engine: Engine, tables: Sequence[str]) -> None:
+    """Explicit ids don't advance PostgreSQL serials; move them past the new rows."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for name in tables:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {name}))"
+            ))
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _to_datetimes(base: datetime, offsets_s: np.ndarray) -> List[datetime]:
+    return [base + timedelta(seconds=float(s)) for s in offsets_s]
+
+
+# ── Generator ─────────────────────────────────────────────────────────
+def generate(engine: Engine, spec: DatasetSpec,
+             progress: Optional[Callable[[str, int, float], None]] = None) -> Dict[str, int]:
+    """
+    Append a synthetic dataset described by `spec` to the database behind
+    `engine` (schema must exist). Returns rows written per table.
+    `progress(table, rows, seconds)` is called after each table.
+    """
+    rng = np.random.default_rng(spec.seed)
+    now = spec.now
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    window_s = spec.days * 86_400
+    start_of_window = now - timedelta(seconds=window_s)
+    counts: Dict[str, int] = {}
+
+    def done(table: str, rows: int, started: float) -> None:
+        counts[table] = rows
+        if progress is not None:
+            progress(table, rows, time.perf_counter() - started)
+
+    # Users
+    started = time.perf_counter()
+    first_user = _next_id(engine, models.User)
+    user_ids = np.arange(first_user, first_user + spec.users)
+    signup_s = rng.random(spec.users) * window_s
+    signed_up = _to_datetimes(start_of_window, signup_s)
+    hashed = hash_password(LOAD_TEST_PASSWORD)  # one bcrypt hash shared by every synthetic user
+    bulk_insert(
+        engine, models.User.__table__,
+        ("id", "name", "email", "hashed_password", "is_active", "created_at"),
+        [(int(uid), f"Load Test User {uid}", f"user{uid}@{EMAIL_DOMAIN}", hashed, True, signed_up[i])
+         for i, uid in enumerate(user_ids)],
+        spec.chunk_size,
+    )
+    done("users", spec.users, started)
+
+    # Topics
+    started = time.perf_counter()
+    first_topic = _next_id(engine, models.Topic)
+    topic_ids = np.arange(first_topic, first_topic + spec.topics)
+    topic_categories = rng.integers(0, len(CATEGORIES), spec.topics)
+    bulk_insert(
+        engine, models.Topic.__table__,
+        ("id", "name", "description", "category", "created_at"),
+        [(int(tid), f"Synthetic Topic {tid}", "Generated for load testing", CATEGORIES[topic_categories[i]],
+          start_of_window) for i, tid in enumerate(topic_ids)],
+        spec.chunk_size,
+    )
+    done("topics", spec.topics, started)
+
+    # Quizzes
+    started = time.perf_counter()
+    first_quiz = _next_id(engine, models.Quiz)
+    quiz_ids = np.arange(first_quiz, first_quiz + spec.quizzes)
+    quiz_topics = topic_ids[rng.integers(0, spec.topics, spec.quizzes)]
+    quiz_levels = rng.choice(len(LEVELS), spec.quizzes, p=LEVEL_WEIGHTS)
+    quiz_difficulty = np.asarray(LEVEL_DIFFICULTY)[quiz_levels] + rng.normal(0.0, 0.4, spec.quizzes)
+    question_counts = rng.integers(spec.min_questions, spec.max_questions + 1, spec.quizzes)
+    bulk_insert(
+        engine, models.Quiz.__table__,
+        ("id", "title", "topic_id", "difficulty_level", "description", "created_at"),
+        [(int(qid), f"Synthetic Quiz {qid}", int(quiz_topics[i]), LEVELS[quiz_levels[i]], "", start_of_window)
+         for i, qid in enumerate(quiz_ids)],
+        spec.chunk_size,
+    )
+    done("quizzes", spec.quizzes, started)
+
+    # Questions; answer keys kept as a padded (quiz, question) matrix for scoring attempts
+    started = time.perf_counter()
+    max_q = spec.max_questions
+    answer_keys = rng.integers(0, 4, (spec.quizzes, max_q))
+    first_question = _next_id(engine, models.Question)
+    question_rows = []
+    next_question = first_question
+    for i, qid in enumerate(quiz_ids):
+        for k in range(question_counts[i]):
+            question_rows.append((next_question, int(qid), f"Question {k + 1} of quiz {qid}",
+                                  OPTIONS_JSON, int(answer_keys[i, k])))
+            next_question += 1
+    bulk_insert(engine, models.Question.__table__,
+                ("id", "quiz_id", "text", "options_json", "correct_answer"), question_rows, spec.chunk_size)
+    done("questions", len(question_rows), started)
+    del question_rows
+
+    _sync_sequences(engine, ("users", "topics", "quizzes", "questions"))
+
+    # Attempts, generated and written one block of users at a time
+    started = time.perf_counter()
+    ability = rng.normal(0.0, 1.0, spec.users)
+    activity = rng.lognormal(0.0, 1.0, spec.users)
+    per_user = rng.multinomial(spec.attempts, activity / activity.sum()) if spec.users else np.zeros(0, int)
+    popularity = 1.0 / np.arange(1, spec.quizzes + 1) ** 1.1
+    popularity = rng.permutation(popularity / popularity.sum())
+
+    attempt_table = models.QuizAttempt.__table__
+    attempt_columns = ("user_id", "quiz_id", "score", "total_questions", "correct_answers",
+                       "time_taken_s", "answers_json", "attempted_at")
+    ends = np.cumsum(per_user)
+    block_start = 0
+    while block_start < spec.users:
+        # Enough users to fill about one chunk of attempts
+        target = (ends[block_start - 1] if block_start else 0) + spec.chunk_size
+        block_end = max(int(np.searchsorted(ends, target, side="right")), block_start + 1)
+        users_in_block = np.arange(block_start, block_end)
+        repeats = per_user[users_in_block]
+        u = np.repeat(users_in_block, repeats)
+        n = len(u)
+        block_start = block_end
+        if n == 0:
+            continue
+
+        q = rng.choice(spec.quizzes, n, p=popularity)
+        total = question_counts[q]
+        p_correct = _sigmoid(1.0 + ability[u] - quiz_difficulty[q] + rng.normal(0.0, 0.3, n))
+        asked = np.arange(max_q) < total[:, None]
+        correct = (rng.random((n, max_q)) < p_correct[:, None]) & asked
+        keys = answer_keys[q]
+        answers = np.where(correct, keys, (keys + rng.integers(1, 4, (n, max_q))) % 4)
+        n_correct = correct.sum(axis=1)
+        scores = np.round(n_correct / total * 100, 2)
+        taken = np.clip(rng.lognormal(np.log(25.0), 0.5, n) * total, 5, 3600).astype(int)
+        at_s = signup_s[u] + rng.random(n) * (window_s - signup_s[u])
+        attempted = _to_datetimes(start_of_window, at_s)
+
+        rows = [
+            (int(user_ids[u[i]]), int(quiz_ids[q[i]]), float(scores[i]), int(total[i]), int(n_correct[i]),
+             int(taken[i]), json.dumps(answers[i, :total[i]].tolist()), attempted[i])
+            for i in range(n)
+        ]
+        bulk_insert(engine, attempt_table, attempt_columns, rows, spec.chunk_size)
+    done("quiz_attempts", int(per_user.sum()), started)
+
+    # Per-user/per-topic aggregates, rebuilt in one INSERT … SELECT
+    started = time.perf_counter()
+    with Session(engine) as db:
+        rows = stats.backfill(db)
+        db.commit()
+    done("user_topic_stats", rows, started)
+
+    started = time.perf_counter()
+    with Session(engine) as db:
+        rows = distributions.backfill(db)
+        db.commit()
+    done("distribution_buckets", rows, started)
+    return counts
@@ -0,0 +1,161 @@
+"""
+Per-quiz and per-topic score/time distributions.
+
+Each (scope, scope_id, metric) keeps a histogram over fixed bucket edges in
+`distribution_buckets`, one row per non-empty bucket. Fixed edges make the
+histograms mergeable: recording an attempt is a count increment in the
+submitting transaction, workers never coordinate, and a percentile rank
+reads at most len(edges) rows no matter how many attempts exist. Scores
+use 1-point buckets; times use roughly geometric buckets up to two hours.
+"""
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+import models
+
+SCORE_EDGES: Tuple[float, ...] = tuple(range(0, 101))  # bucket 100 holds perfect scores
+TIME_EDGES: Tuple[float, ...] = (
+    0, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200,
+)
+EDGES: Dict[str, Tuple[float, ...]] = {"score": SCORE_EDGES, "time": TIME_EDGES}
+
+_KEY = Tuple[str, int, str, int]  # scope, scope_id, metric, bucket
+
+
+def bucket_of(edges: Sequence[float], value: float) -> int:
+    """Index of the bucket [edges[i], edges[i + 1]) holding value; the last bucket is open-ended."""
+    return max(bisect_right(edges, value) - 1, 0)
+
+
+def _keys(quiz_id: int, topic_id: int, score: float, time_taken_s: Optional[int]) -> List[_KEY]:
+    score_bucket = bucket_of(SCORE_EDGES, score)
+    time_bucket = bucket_of(TIME_EDGES, time_taken_s or 0)
+    return [
+        ("quiz", quiz_id, "score", score_bucket),
+        ("quiz", quiz_id, "time", time_bucket),
+        ("topic", topic_id, "score", score_bucket),
+        ("topic", topic_id, "time", time_bucket),
+    ]
+
+
+def _upsert_stmt(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    bucket = models.DistributionBucket
+    stmt = dialect_insert(bucket)
+    return stmt.on_conflict_do_update(
+        index_elements=[bucket.scope, bucket.scope_id, bucket.metric, bucket.bucket],
+        set_={"count": bucket.count + stmt.excluded.count},
+    )
+
+
+def _rows(counts: Counter) -> List[dict]:
+    # Sorted so concurrent writers lock rows in the same order
+    return [
+        {"scope": scope, "scope_id": scope_id, "metric": metric, "bucket": b, "count": n}
+        for (scope, scope_id, metric, b), n in sorted(counts.items())
+    ]
+
+
+def _apply(db: Session, counts: Counter) -> None:
+    rows = _rows(counts)
+    stmt = _upsert_stmt(db)
+    if stmt is not None:
+        db.execute(stmt, rows)
+        return
+
+    bucket = models.DistributionBucket
+    for values in rows:
+        updated = (
+            db.query(bucket)
+            .filter(
+                bucket.scope == values["scope"], bucket.scope_id == values["scope_id"],
+                bucket.metric == values["metric"], bucket.bucket == values["bucket"],
+            )
+            .update({bucket.count: bucket.count + values["count"]}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(bucket(**values))
+
+
+def record_attempts(db: Session, attempts: Iterable[Tuple[int, int, float, Optional[int]]]) -> None:
+    """
+    Add attempts, given as (quiz_id, topic_id, score, time_taken_s), to their
+    quiz and topic histograms. Runs in the caller's transaction; the caller commits.
+    """
+    counts: Counter = Counter()
+    for quiz_id, topic_id, score, time_taken_s in attempts:
+        counts.update(_keys(quiz_id, topic_id, score, time_taken_s))
+    if counts:
+        _apply(db, counts)
+
+
+def record_attempt(db: Session, attempt: models.QuizAttempt, topic_id: int) -> None:
+    record_attempts(db, [(attempt.quiz_id, topic_id, attempt.score, attempt.time_taken_s)])
+
+
+def get_histograms(db: Session, scope: str, scope_id: int) -> Dict[str, Dict[int, int]]:
+    """{metric: {bucket: count}} for one quiz or topic, read in one index range scan."""
+    bucket = models.DistributionBucket
+    rows = db.execute(
+        select(bucket.metric, bucket.bucket, bucket.count)
+        .where(bucket.scope == scope, bucket.scope_id == scope_id)
+    ).all()
+    histograms: Dict[str, Dict[int, int]] = {metric: {} for metric in EDGES}
+    for metric, b, count in rows:
+        histograms.setdefault(metric, {})[b] = count
+    return histograms
+
+
+def percentile_rank(edges: Sequence[float], counts: Dict[int, int], value: float) -> Optional[float]:
+    """
+    Percentage of recorded values below `value`, interpolating linearly inside
+    its bucket. None for an empty histogram.
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    b = bucket_of(edges, value)
+    below = sum(n for i, n in counts.items() if i < b)
+    within = counts.get(b, 0)
+    if b + 1 < len(edges):
+        lo, hi = edges[b], edges[b + 1]
+        fraction = min(max((value - lo) / (hi - lo), 0.0), 1.0)
+    else:
+        fraction = 0.5  # open-ended last bucket
+    return round((below + within * fraction) / total * 100, 2)
+
+
+def backfill(db: Session, batch_size: int = 50_000) -> int:
+    """
+    Rebuild every histogram from quiz_attempts. The database groups attempts
+    by distinct score and time per quiz first, so Python only buckets those
+    groups. Returns bucket rows written.
+    """
+    attempt = models.QuizAttempt
+    counts: Counter = Counter()
+    for metric, column, edges in (("score", attempt.score, SCORE_EDGES), ("time", attempt.time_taken_s, TIME_EDGES)):
+        groups = db.execute(
+            select(attempt.quiz_id, models.Quiz.topic_id, column, func.count())
+            .join(models.Quiz, models.Quiz.id == attempt.quiz_id)
+            .group_by(attempt.quiz_id, models.Quiz.topic_id, column)
+            .execution_options(yield_per=batch_size)
+        )
+        for quiz_id, topic_id, value, n in groups:
+            b = bucket_of(edges, value or 0)
+            counts[("quiz", quiz_id, metric, b)] += n
+            counts[("topic", topic_id, metric, b)] += n
+
+    db.execute(delete(models.DistributionBucket))
+    rows = _rows(counts)
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(models.DistributionBucket), rows[start:start + batch_size])
+    return len(rows)
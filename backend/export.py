@@ -0,0 +1,113 @@
+"""
+Streaming export of quiz attempts, joined with their quiz and topic.
+
+iter_attempts() yields the encoded body in chunks of `chunk_size` rows.
+Rows come from a server-side cursor (yield_per/stream_results), so memory
+stays flat whatever the table size: one chunk of rows plus one chunk of
+output at a time. Rows are ordered by attempt id; pass the last exported id
+as since_id to pick up only newer attempts on the next run.
+
+Formats: "ndjson" (one JSON object per line, answers as a list) and "csv"
+(header row, answers as their stored JSON text).
+"""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import fastjson
+import models
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+COLUMNS = (
+    "id", "user_id", "quiz_id", "quiz_title", "difficulty_level", "topic_id", "topic_name",
+    "topic_category", "score", "total_questions", "correct_answers", "time_taken_s",
+    "attempted_at", "answers",
+)
+
+
+def naive_utc(at: Optional[datetime]) -> Optional[datetime]:
+    """attempted_at is stored as naive UTC; convert an aware bound to match."""
+    if at is not None and at.tzinfo is not None:
+        try:
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+        except OverflowError:
+            raise ValueError(f"{at.isoformat()} is out of range")
+    return at
+
+
+def attempts_query(
+    since_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+):
+    """Attempts with id > since_id and start <= attempted_at < end, in id order."""
+    attempt, quiz, topic = models.QuizAttempt, models.Quiz, models.Topic
+    stmt = (
+        select(
+            attempt.id, attempt.user_id, attempt.quiz_id, quiz.title, quiz.difficulty_level,
+            quiz.topic_id, topic.name, topic.category, attempt.score, attempt.total_questions,
+            attempt.correct_answers, attempt.time_taken_s, attempt.attempted_at, attempt.answers_json,
+        )
+        .join(quiz, quiz.id == attempt.quiz_id)
+        .join(topic, topic.id == quiz.topic_id)
+        .order_by(attempt.id)
+    )
+    if since_id is not None:
+        stmt = stmt.where(attempt.id > since_id)
+    if start is not None:
+        stmt = stmt.where(attempt.attempted_at >= naive_utc(start))
+    if end is not None:
+        stmt = stmt.where(attempt.attempted_at < naive_utc(end))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _ndjson_chunk(rows) -> bytes:
+    lines = []
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record["answers"] = json.loads(record["answers"] or "[]")
+        lines.append(fastjson.dumps(record))
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def _csv_chunk(rows, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(
+        row[:12] + (row[12].isoformat() if row[12] else "", row[13]) for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def iter_attempts(
+    db: Session,
+    fmt: str = "ndjson",
+    since_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = 2_000,
+) -> Iterator[bytes]:
+    """Encoded export body, one chunk of rows at a time."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    result = db.execute(
+        attempts_query(since_id, start, end, limit).execution_options(yield_per=chunk_size)
+    )
+    try:
+        if fmt == "csv":
+            yield _csv_chunk((), header=True)
+        for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
+    finally:
+        result.close()
@@ -0,0 +1,43 @@
+"""
+Fast JSON response path.
+
+Hot read endpoints build plain dicts/lists straight from row tuples and
+return them as a FastJSONResponse. Returning a Response makes FastAPI skip
+response_model validation and serialisation, while the route's declared
+response_model still documents the body in the OpenAPI schema. Callers are
+responsible for producing exactly that shape (e.g. float() on float fields,
+since the model would have turned 0 into 0.0).
+
+orjson is used when installed; otherwise the stdlib encoder produces the
+same compact output, just more slowly.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):  # already serialised (e.g. cached)
+            return content
+        return dumps(content)
@@ -0,0 +1,134 @@
+"""
+Per-request timing and SQL accounting.
+
+RequestMetricsMiddleware (plain ASGI, so no extra task per request) times
+every HTTP request by route template and, through SQLAlchemy cursor
+events on the app's engines, counts the queries it ran and the time spent
+in them. Totals go into the histograms below (exported at /metrics).
+Requests slower than slow_request_ms or running more than
+slow_request_queries queries are logged together with their queries.
+
+The current request travels in a ContextVar. Starlette copies the context
+into the threadpool for sync handlers and SQLAlchemy carries it into its
+async greenlets, so queries are attributed in both modes. Queries from
+threads that aren't serving a request (e.g. background writers) are not
+counted.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import get_settings
+from metrics import COUNT_BUCKETS, Histogram
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ["method", "route"], COUNT_BUCKETS
+)
+db_seconds_per_request = Histogram(
+    "db_seconds_per_request", "Time spent in SQL statements per HTTP request", ["method", "route"]
+)
+
+MAX_LOGGED_QUERIES = 100  # per request; the count stays exact beyond this
+
+
+class RequestStats:
+    __slots__ = ("query_count", "db_seconds", "queries")
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.queries: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.query_count += 1
+        self.db_seconds += seconds
+        if len(self.queries) < MAX_LOGGED_QUERIES:
+            self.queries.append((statement, seconds))
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# ── SQLAlchemy hooks ──────────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def instrument_engines(engines: Iterable[Engine]) -> None:
+    for engine in engines:
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ── ASGI middleware ───────────────────────────────────────────────────
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners can't blow up cardinality
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            self._observe(scope, status[0], elapsed, stats)
+
+    @staticmethod
+    def _observe(scope, status: int, elapsed: float, stats: RequestStats) -> None:
+        method, route = scope["method"], _route_label(scope)
+        http_request_seconds.observe(elapsed, method, route, status)
+        db_queries_per_request.observe(stats.query_count, method, route)
+        db_seconds_per_request.observe(stats.db_seconds, method, route)
+
+        if elapsed * 1000 >= settings.slow_request_ms or stats.query_count > settings.slow_request_queries:
+            lines = [f"  {seconds * 1000:8.2f} ms  {' '.join(statement.split())}" for statement, seconds in stats.queries]
+            if stats.query_count > len(stats.queries):
+                lines.append(f"  ... {stats.query_count - len(stats.queries)} more")
+            logger.warning(
+                "Slow request %s %s -> %s: %.1f ms, %d queries, %.1f ms in SQL\n%s",
+                method, scope["path"], status, elapsed * 1000, stats.query_count, stats.db_seconds * 1000,
+                "\n".join(lines),
+            )
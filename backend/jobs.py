@@ -0,0 +1,223 @@
+"""
+Batch jobs run from manage.py (nightly refreshes, maintenance).
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+import numpy as np
+from scipy import sparse
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.orm import Session
+from config import get_settings
+from ml.clustering import ClusterModel, fit_cluster_model, save_model
+from ml.recommender import generate_recommendations_batch
+import models
+import stats
+
+
+def load_topics(db: Session) -> List[dict]:
+    """All topics as {id, name} dicts in id order (the order recommendations use)."""
+    rows = db.execute(select(models.Topic.id, models.Topic.name).order_by(models.Topic.id)).all()
+    return [{"id": r.id, "name": r.name} for r in rows]
+
+
+def load_score_matrices(db: Session, topics: List[dict]):
+    """
+    Build sparse user×topic mastery, mastery-weight, attempt-count and
+    time-sum matrices from user_topic_stats (see stats.mastery_terms).
+    Returns (user_ids, masteries, mastery_weights, attempt_counts, time_sums).
+    """
+    user_ids = db.execute(select(models.User.id).order_by(models.User.id)).scalars().all()
+    row_of = {uid: i for i, uid in enumerate(user_ids)}
+    col_of = {t["id"]: j for j, t in enumerate(topics)}
+
+    stat = models.UserTopicStat
+    rows = db.execute(
+        select(
+            stat.user_id, stat.topic_id, stat.score_sum, stat.attempt_count,
+            stat.mastery_sum, stat.mastery_weight, stat.mastery_at, stat.time_sum,
+        )
+        .where(stat.attempt_count > 0)
+        .order_by(stat.user_id, stat.topic_id)
+    ).all()
+    rows = [r for r in rows if r.user_id in row_of and r.topic_id in col_of]
+    # Mastery weights are rescaled per student, so build terms user by user
+    terms = [
+        term for _, user_rows in groupby(rows, key=lambda r: r.user_id)
+        for term in stats.mastery_terms(list(user_rows))
+    ]
+
+    r_idx = np.fromiter((row_of[r.user_id] for r in rows), dtype=np.int64, count=len(rows))
+    c_idx = np.fromiter((col_of[r.topic_id] for r in rows), dtype=np.int64, count=len(rows))
+    shape = (len(user_ids), len(topics))
+    masteries = sparse.csr_matrix(
+        (np.fromiter((t[0] for t in terms), dtype=float, count=len(rows)), (r_idx, c_idx)),
+        shape=shape,
+    )
+    mastery_weights = sparse.csr_matrix(
+        (np.fromiter((t[1] for t in terms), dtype=float, count=len(rows)), (r_idx, c_idx)),
+        shape=shape,
+    )
+    attempt_counts = sparse.csr_matrix(
+        (np.fromiter((r.attempt_count for r in rows), dtype=float, count=len(rows)), (r_idx, c_idx)),
+        shape=shape,
+    )
+    time_sums = sparse.csr_matrix(
+        (np.fromiter((r.time_sum or 0 for r in rows), dtype=float, count=len(rows)), (r_idx, c_idx)),
+        shape=shape,
+    )
+    return user_ids, masteries, mastery_weights, attempt_counts, time_sums
+
+
+def _latest_recommendations(db: Session) -> Dict[int, tuple]:
+    """{user_id: (topic_id, level, adjustment, reasoning)} of each user's newest row."""
+    rec = models.Recommendation
+    rank = func.row_number().over(
+        partition_by=rec.user_id, order_by=(rec.created_at.desc(), rec.id.desc())
+    ).label("rank")
+    ranked = select(
+        rec.user_id, rec.recommended_topic_id, rec.current_level,
+        rec.difficulty_adjustment, rec.reasoning, rank,
+    ).subquery()
+    rows = db.execute(select(ranked).where(ranked.c.rank == 1)).all()
+    return {r[0]: tuple(r[1:5]) for r in rows}
+
+
+def refresh_all_recommendations(db: Session, chunk_size: int = 10_000, dedupe: bool = True) -> int:
+    """
+    Recompute and store a Recommendation row for every student.
+    Uses the vectorised batch recommender and bulk inserts in chunks.
+    With `dedupe`, students whose result matches their latest stored
+    recommendation are skipped. Returns rows written; the caller commits.
+    """
+    topics = load_topics(db)
+    if not topics:
+        return 0
+    user_ids, masteries, mastery_weights, attempt_counts, time_sums = load_score_matrices(db, topics)
+    recs = generate_recommendations_batch(
+        user_ids, masteries, mastery_weights, attempt_counts, time_sums, topics, chunk_size=chunk_size
+    )
+    if dedupe:
+        latest = _latest_recommendations(db)
+        recs = [
+            r for r in recs
+            if latest.get(r["student_id"]) != (
+                r["recommended_topic_id"], r["current_level"],
+                r["difficulty_adjustment"], r["reasoning"],
+            )
+        ]
+
+    created_at = datetime.utcnow()
+    for start in range(0, len(recs), chunk_size):
+        db.execute(
+            insert(models.Recommendation),
+            [
+                {
+                    "user_id": rec["student_id"],
+                    "recommended_topic_id": rec["recommended_topic_id"],
+                    "current_level": rec["current_level"],
+                    "difficulty_adjustment": rec["difficulty_adjustment"],
+                    "reasoning": rec["reasoning"],
+                    "created_at": created_at,
+                }
+                for rec in recs[start:start + chunk_size]
+            ],
+        )
+    return len(recs)
+
+
+def load_student_features(db: Session, user_ids: Optional[List[int]] = None):
+    """
+    Per-student clustering features from one ordered scan of user_topic_stats
+    (limited to `user_ids` when given). Returns (user_ids, X) with X columns
+    avg_score, total_attempts, avg_time, where avg_score is the student's
+    overall mastery (decayed average).
+    """
+    stat = models.UserTopicStat
+    stmt = (
+        select(
+            stat.user_id, stat.score_sum, stat.attempt_count, stat.time_sum,
+            stat.mastery_sum, stat.mastery_weight, stat.mastery_at,
+        )
+        .where(stat.attempt_count > 0)
+        .order_by(stat.user_id)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(stat.user_id.in_(user_ids))
+    rows = db.execute(stmt).all()
+
+    ids: List[int] = []
+
+    features = []
+    for user_id, user_rows in groupby(rows, key=lambda r: r.user_id):
+        user_rows = list(user_rows)
+        count = sum(r.attempt_count for r in user_rows)
+        time_sum = sum(r.time_sum or 0 for r in user_rows)
+        ids.append(user_id)
+        features.append((stats.overall_mastery(stats.mastery_terms(user_rows)), count, time_sum / count))
+    return ids, np.array(features, dtype=float).reshape(-1, 3)
+
+
+def fit_clusters(db: Session, path: Optional[str] = None) -> Optional[ClusterModel]:
+    """
+    Fit the population clustering model and atomically publish it to disk.
+    Returns the saved model, or None if there are too few students.
+    """
+    settings = get_settings()
+    _, X = load_student_features(db)
+    model = fit_cluster_model(X, batch_size=settings.cluster_batch_size)
+    if model is None:
+        return None
+    return save_model(model, path or settings.cluster_model_path)
+
+
+def compact_recommendations(
+    db: Session, keep_latest: int = 20, older_than_days: int = 90, dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Shrink the recommendations history table:
+      1. drop rows identical to the same user's previous row (repeat polls);
+      2. drop rows older than `older_than_days`, always keeping each user's
+         `keep_latest` newest rows.
+    Returns the number of rows removed (or that would be) per step.
+    """
+    rec = models.Recommendation
+    order = (rec.created_at, rec.id)
+
+    def prev(col):
+        return func.lag(col).over(partition_by=rec.user_id, order_by=order)
+
+    with_prev = select(
+        rec.id,
+        rec.recommended_topic_id, prev(rec.recommended_topic_id).label("p_topic"),
+        rec.current_level, prev(rec.current_level).label("p_level"),
+        rec.difficulty_adjustment, prev(rec.difficulty_adjustment).label("p_adj"),
+        rec.reasoning, prev(rec.reasoning).label("p_reason"),
+    ).subquery()
+    duplicate_ids = select(with_prev.c.id).where(and_(
+        with_prev.c.recommended_topic_id == with_prev.c.p_topic,
+        with_prev.c.current_level == with_prev.c.p_level,
+        with_prev.c.difficulty_adjustment == with_prev.c.p_adj,
+        with_prev.c.reasoning == with_prev.c.p_reason,
+    ))
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    ranked = select(
+        rec.id,
+        rec.created_at,
+        func.row_number().over(
+            partition_by=rec.user_id, order_by=(rec.created_at.desc(), rec.id.desc())
+        ).label("rank"),
+    ).subquery()
+    expired_ids = select(ranked.c.id).where(ranked.c.rank > keep_latest, ranked.c.created_at < cutoff)
+
+    removed = {}
+    for step, ids in (("duplicates", duplicate_ids), ("expired", expired_ids)):
+        if dry_run:
+            removed[step] = db.execute(select(func.count()).select_from(ids.subquery())).scalar_one()
+        else:
+            result = db.execute(
+                delete(rec).where(rec.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            removed[step] = result.rowcount
+    return removed
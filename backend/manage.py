@@ -0,0 +1,248 @@
+"""
+Maintenance commands for the backend.
+
+Usage (from the backend/ directory):
+    python manage.py init-db [--force]
+    python manage.py migrate [--revision REV]
+    python manage.py check-query-plans [--verbose]
+    python manage.py backfill-stats [--user-id ID]
+    python manage.py backfill-distributions
+    python manage.py refresh-recommendations [--chunk-size N]
+    python manage.py fit-clusters [--output PATH]
+    python manage.py compact-recommendations [--keep N] [--older-than-days D] [--dry-run]
+    python manage.py generate-data [--users N] [--quizzes N] [--attempts N] [--seed S] [--now T] ...
+    python manage.py export-attempts [--format ndjson|csv] [--since-id ID] [--from T] [--to T] [--output PATH]
+
+fit-clusters is meant to run on a schedule (e.g. nightly cron); running
+API workers pick up the new model file without a restart.
+"""
+import argparse
+import sys
+from datetime import datetime
+from config import get_settings
+from database import engine, ReadSessionLocal, SessionLocal
+from migrate import init_database, upgrade_database
+import models  # noqa: F401  (registers tables on Base.metadata)
+import datagen
+import distributions
+import export
+import jobs
+import query_plans
+import stats
+
+
+def cmd_init_db(args):
+    """Migrate and seed the database; a no-op if that has already been done."""
+    if init_database(force=args.force):
+        print("Database initialised")
+    else:
+        print("Database already initialised")
+
+
+def cmd_migrate(args):
+    """Apply Alembic migrations, adopting databases created by create_all()."""
+    upgrade_database(args.revision)
+    print(f"Database upgraded to {args.revision}")
+
+
+def cmd_check_query_plans(args):
+    """EXPLAIN the hot queries and fail if any falls back to a full table scan."""
+    upgrade_database()
+    with engine.begin() as conn:
+        results = query_plans.check_query_plans(conn)
+    failed = [r for r in results if r.full_scans]
+    for r in results:
+        status = "FULL SCAN " + ", ".join(r.full_scans) if r.full_scans else "ok"
+        print(f"{r.name:<48} {status}")
+        if args.verbose or r.full_scans:
+            for line in r.plan:
+                print(f"    {line}")
+    if failed:
+        print(f"{len(failed)} of {len(results)} hot queries scan a whole table")
+        sys.exit(1)
+
+
+def cmd_backfill_stats(args):
+    """Rebuild user_topic_stats from quiz_attempts."""
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        rows = stats.backfill(db, user_id=args.user_id)
+        db.commit()
+        print(f"Backfilled {rows} user/topic aggregate rows")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_backfill_distributions(args):
+    """Rebuild the per-quiz/per-topic score and time histograms from quiz_attempts."""
+    upgrade_database()
+    db = SessionLocal()
+    try:
+        rows = distributions.backfill(db)
+        db.commit()
+        print(f"Backfilled {rows} distribution buckets")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_refresh_recommendations(args):
+    """Recompute recommendations for every student in one batch pass."""
+    db = SessionLocal()
+    try:
+        rows = jobs.refresh_all_recommendations(
+            db, chunk_size=args.chunk_size, dedupe=not args.no_dedupe
+        )
+        db.commit()
+        print(f"Stored {rows} recommendations")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_fit_clusters(args):
+    """Fit the population K-Means model and publish it for the API workers."""
+    db = SessionLocal()
+    try:
+        model = jobs.fit_clusters(db, path=args.output)
+    finally:
+        db.close()
+    if model is None:
+        print("Not enough students with attempts to fit clusters; model unchanged")
+        return
+    print(f"Saved cluster model v{model.version} ({model.n_samples} students): {model.labels}")
+
+
+def cmd_compact_recommendations(args):
+    """Remove repeated and expired rows from the recommendations history."""
+    db = SessionLocal()
+    try:
+        removed = jobs.compact_recommendations(
+            db, keep_latest=args.keep, older_than_days=args.older_than_days, dry_run=args.dry_run
+        )
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"{verb} {removed['duplicates']} repeated and {removed['expired']} expired recommendations")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_generate_data(args):
+    """Append a synthetic load-testing dataset; see datagen.py for the distributions."""
+    if args.min_questions < 1 or args.max_questions < args.min_questions:
+        sys.exit("--min-questions must be at least 1 and at most --max-questions")
+    if args.attempts and not (args.users and args.quizzes):
+        sys.exit("attempts need at least one user and one quiz")
+    spec = datagen.DatasetSpec(
+        users=args.users, topics=args.topics, quizzes=args.quizzes, attempts=args.attempts,
+        min_questions=args.min_questions, max_questions=args.max_questions,
+        days=args.days, now=args.now, seed=args.seed, chunk_size=args.chunk_size,
+    )
+    upgrade_database()
+
+    def report(table, rows, seconds):
+        print(f"{table:<18} {rows:>12,} rows {seconds:>8.1f}s {rows / max(seconds, 1e-9):>12,.0f} rows/s")
+
+    datagen.generate(engine, spec, progress=report)
+    print(f"Synthetic users log in as user<ID>@{datagen.EMAIL_DOMAIN} / {datagen.LOAD_TEST_PASSWORD}")
+
+
+def cmd_export_attempts(args):
+    """Stream attempts joined with quiz/topic to a file or stdout in constant memory."""
+    db = ReadSessionLocal()
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export.iter_attempts(
+            db, args.format, since_id=args.since_id, start=args.start, end=args.end,
+            limit=args.limit, chunk_size=args.chunk_size,
+        ):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        db.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Personalised Learning API maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("init-db", help="Migrate and seed the database")
+    p.add_argument("--force", action="store_true", help="Run even if already at head and seeded")
+    p.set_defaults(func=cmd_init_db)
+
+    p = sub.add_parser("migrate", help="Apply schema migrations")
+    p.add_argument("--revision", default="head", help="Target revision (default: head)")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("check-query-plans", help="Fail if a hot query needs a full table scan")
+    p.add_argument("--verbose", action="store_true", help="Print every plan, not just failures")
+    p.set_defaults(func=cmd_check_query_plans)
+
+    p = sub.add_parser("backfill-stats", help="Rebuild per-user/per-topic aggregates")
+    p.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    p.set_defaults(func=cmd_backfill_stats)
+
+    p = sub.add_parser("backfill-distributions", help="Rebuild score/time histograms per quiz and topic")
+    p.set_defaults(func=cmd_backfill_distributions)
+
+    p = sub.add_parser("refresh-recommendations", help="Nightly batch recommendation refresh")
+    p.add_argument("--chunk-size", type=int, default=10_000, help="Students per vectorised pass")
+    p.add_argument("--no-dedupe", action="store_true", help="Store rows even if unchanged")
+    p.set_defaults(func=cmd_refresh_recommendations)
+
+    p = sub.add_parser("fit-clusters", help="Fit and publish the student clustering model")
+    p.add_argument("--output", default=None, help="Model path (defaults to CLUSTER_MODEL_PATH)")
+    p.set_defaults(func=cmd_fit_clusters)
+
+    p = sub.add_parser("compact-recommendations", help="Apply retention to recommendation history")
+    p.add_argument("--keep", type=int, default=20, help="Newest rows always kept per student")
+    p.add_argument("--older-than-days", type=int, default=90, help="Only expire rows older than this")
+    p.add_argument("--dry-run", action="store_true", help="Report counts without deleting")
+    p.set_defaults(func=cmd_compact_recommendations)
+
+    defaults = datagen.DatasetSpec()
+    p = sub.add_parser("generate-data", help="Append a synthetic dataset for load testing")
+    p.add_argument("--users", type=int, default=defaults.users)
+    p.add_argument("--topics", type=int, default=defaults.topics)
+    p.add_argument("--quizzes", type=int, default=defaults.quizzes)
+    p.add_argument("--attempts", type=int, default=defaults.attempts, help="Total attempts across all users")
+    p.add_argument("--min-questions", type=int, default=defaults.min_questions)
+    p.add_argument("--max-questions", type=int, default=defaults.max_questions)
+    p.add_argument("--days", type=int, default=defaults.days, help="History window for sign-ups and attempts")
+    p.add_argument("--now", type=datetime.fromisoformat, default=defaults.now,
+                   help=f"End of the history window (default {defaults.now.isoformat()})")
+    p.add_argument("--seed", type=int, default=defaults.seed, help="Same seed and sizes give the same data")
+    p.add_argument("--chunk-size", type=int, default=defaults.chunk_size, help="Rows per insert transaction")
+    p.set_defaults(func=cmd_generate_data)
+
+    p = sub.add_parser("export-attempts", help="Stream attempts with quiz/topic as NDJSON or CSV")
+    p.add_argument("--format", choices=sorted(export.FORMATS), default="ndjson")
+    p.add_argument("--since-id", type=int, default=None, help="Only attempts with a larger id (incremental)")
+    p.add_argument("--from", dest="start", type=datetime.fromisoformat, default=None, help="attempted_at >= this")
+    p.add_argument("--to", dest="end", type=datetime.fromisoformat, default=None, help="attempted_at < this")
+    p.add_argument("--limit", type=int, default=None)
+    p.add_argument("--chunk-size", type=int, default=get_settings().export_chunk_size, help="Rows per fetch")
+    p.add_argument("--output", default=None, help="File to write (default: stdout)")
+    p.set_defaults(func=cmd_export_attempts)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
@@ -0,0 +1,89 @@
+"""
+Minimal in-process metrics.
+
+Histogram keeps cumulative bucket counts, a sum and a count per label set,
+in the shape Prometheus expects. Instances register themselves in REGISTRY;
+render_prometheus() turns the registry into the text exposition format
+served at /metrics.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; suits anything from a cache hit to a slow bcrypt hash
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Per-request SQL query counts
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20, 35, 50, 100, 250)
+
+REGISTRY: List["Histogram"] = []
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """{labelvalues: {"buckets": [(le, cumulative count)], "sum": s, "count": n}}"""
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        result = {}
+        for key, values in series.items():
+            cumulative, running = [], 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                running += count
+                cumulative.append((bound, running))
+            result[key] = {"buckets": cumulative, "sum": values[-1], "count": running}
+        return result
+
+
+# ── Prometheus text format ────────────────────────────────────────────
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_prometheus(registry: Optional[Sequence[Histogram]] = None) -> str:
+    lines = []
+    for hist in REGISTRY if registry is None else registry:
+        lines.append(f"# HELP {hist.name} {hist.documentation}")
+        lines.append(f"# TYPE {hist.name} histogram")
+        for key, data in sorted(hist.snapshot().items()):
+            base = list(zip(hist.labelnames, key))
+            for bound, count in data["buckets"]:
+                lines.append(f"{hist.name}_bucket{_labels(base + [('le', _format_value(bound))])} {count}")
+            lines.append(f"{hist.name}_sum{_labels(base)} {_format_value(data['sum'])}")
+            lines.append(f"{hist.name}_count{_labels(base)} {data['count']}")
+    return "\n".join(lines) + "\n"
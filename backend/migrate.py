@@ -0,0 +1,66 @@
+"""
+Schema migrations via Alembic (migrations/).
+
+upgrade_database() brings the configured database to the latest revision.
+Databases created by the old create_all() startup path have the tables but
+no alembic_version row; they are stamped with the revision their tables
+match before upgrading, so no table is created twice.
+
+init_database() is the startup step: migrate and seed, unless the database
+is already at the head revision and seeded, in which case it costs two
+small queries.
+"""
+import os
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from database import engine
+from seed import seed_database
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def alembic_config() -> Config:
+    cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def _legacy_revision(tables: set) -> str:
+    return "0002" if "user_topic_stats" in tables else "0001"
+
+
+def upgrade_database(revision: str = "head") -> None:
+    cfg = alembic_config()
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" not in tables and "users" in tables:
+        command.stamp(cfg, _legacy_revision(tables))
+    command.upgrade(cfg, revision)
+
+
+def head_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def database_initialised() -> bool:
+    """True when the schema is at the head revision and seed data is present."""
+    try:
+        with engine.connect() as conn:
+            current = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+            seeded = conn.execute(text("SELECT 1 FROM users LIMIT 1")).first() is not None
+    except SQLAlchemyError:  # no alembic_version/users table yet
+        return False
+    return seeded and current == head_revision()
+
+
+def init_database(force: bool = False) -> bool:
+    """Migrate and seed if needed. Returns False when there was nothing to do."""
+    if not force and database_initialised():
+        return False
+    upgrade_database()
+    seed_database()
+    return True
@@ -0,0 +1,120 @@
+"""initial schema
+
+Tables as originally created by Base.metadata.create_all().
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"], unique=False)
+
+    op.create_table(
+        "topics",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_topics_id", "topics", ["id"], unique=False)
+
+    op.create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=300), nullable=False),
+        sa.Column("topic_id", sa.Integer(), nullable=False),
+        sa.Column("difficulty_level", sa.String(length=20), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["topic_id"], ["topics.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quizzes_id", "quizzes", ["id"], unique=False)
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("options_json", sa.Text(), nullable=False),
+        sa.Column("correct_answer", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_questions_id", "questions", ["id"], unique=False)
+
+    op.create_table(
+        "quiz_attempts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("quiz_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("total_questions", sa.Integer(), nullable=False),
+        sa.Column("correct_answers", sa.Integer(), nullable=False),
+        sa.Column("time_taken_s", sa.Integer(), nullable=True),
+        sa.Column("answers_json", sa.Text(), nullable=True),
+        sa.Column("attempted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["quiz_id"], ["quizzes.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quiz_attempts_id", "quiz_attempts", ["id"], unique=False)
+
+    op.create_table(
+        "recommendations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("recommended_topic_id", sa.Integer(), nullable=False),
+        sa.Column("current_level", sa.String(length=30), nullable=False),
+        sa.Column("difficulty_adjustment", sa.String(length=20), nullable=False),
+        sa.Column("reasoning", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["recommended_topic_id"], ["topics.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_recommendations_id", "recommendations", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendations_id", table_name="recommendations")
+    op.drop_table("recommendations")
+    op.drop_index("ix_quiz_attempts_id", table_name="quiz_attempts")
+    op.drop_table("quiz_attempts")
+    op.drop_index("ix_questions_id", table_name="questions")
+    op.drop_table("questions")
+    op.drop_index("ix_quizzes_id", table_name="quizzes")
+    op.drop_table("quizzes")
+    op.drop_index("ix_topics_id", table_name="topics")
+    op.drop_table("topics")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,39 @@
+"""hot-path composite indexes
+
+Index the query shapes behind attempt history and progress, answer keys and
+quiz detail, per-quiz attempt lookups, and recommendation history/dedupe.
+`python manage.py check-query-plans` verifies they are used.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_quiz_attempts_user_id_attempted_at_id", "quiz_attempts", ["user_id", "attempted_at", "id"]
+    )
+    op.create_index("ix_quiz_attempts_quiz_id", "quiz_attempts", ["quiz_id"])
+    op.create_index("ix_questions_quiz_id_id", "questions", ["quiz_id", "id"])
+    op.create_index(
+        "ix_recommendations_user_id_created_at_id", "recommendations", ["user_id", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendations_user_id_created_at_id", table_name="recommendations")
+    op.drop_index("ix_questions_quiz_id_id", table_name="questions")
+    op.drop_index("ix_quiz_attempts_quiz_id", table_name="quiz_attempts")
+    op.drop_index("ix_quiz_attempts_user_id_attempted_at_id", table_name="quiz_attempts")
@@ -0,0 +1,37 @@
+"""distribution_buckets histograms
+
+Per-quiz and per-topic score/time histograms; fill with
+`python manage.py backfill-distributions`.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "distribution_buckets",
+        sa.Column("scope", sa.String(length=10), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("metric", sa.String(length=10), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "scope_id", "metric", "bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("distribution_buckets")
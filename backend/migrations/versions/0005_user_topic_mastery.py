@@ -0,0 +1,34 @@
+"""user_topic_stats mastery terms
+
+Time-decayed mastery sums per user and topic; fill with
+`python manage.py backfill-stats`. Until then reads fall back to the plain
+average.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("user_topic_stats", sa.Column("mastery_sum", sa.Float(), server_default="0", nullable=False))
+    op.add_column("user_topic_stats", sa.Column("mastery_weight", sa.Float(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    # SQLite can't drop columns in place; batch mode rebuilds the table
+    with op.batch_alter_table("user_topic_stats") as batch_op:
+        batch_op.drop_column("mastery_weight")
+        batch_op.drop_column("mastery_sum")
@@ -0,0 +1,33 @@
+"""user_topic_stats mastery reference time
+
+Mastery sums become relative to the row's newest attempt (mastery_at, in
+days since stats.MASTERY_EPOCH) instead of the epoch itself, so weights no
+longer grow without bound. Existing sums are epoch-relative, which is what
+the default of 0 says; they are rescaled on the next attempt.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("user_topic_stats", sa.Column("mastery_at", sa.Float(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    # SQLite can't drop columns in place; batch mode rebuilds the table
+    with op.batch_alter_table("user_topic_stats") as batch_op:
+        batch_op.drop_column("mastery_at")
@@ -4,18 +4,39 @@ K-Means clustering to assign students to performance clusters:
   Cluster 1 → Intermediate
   Cluster 2 → Advanced
 Features used: avg_score, total_attempts, avg_time (normalised)
+
+A population model is fitted offline (manage.py fit-clusters) and saved as
+a small JSON file. get_student_level() predicts from the loaded model and
+falls back to fixed score thresholds until a model exists.
 """
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from typing import List, Dict
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Optional, Set
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# numpy and scikit-learn are imported where they are used: together they are
+# most of the API's import time, and serving single predictions needs neither.
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
 
 # Map cluster center rank → readable label
 LEVEL_LABELS = ["Beginner", "Intermediate", "Advanced"]
+FEATURES = ["avg_score", "total_attempts", "avg_time"]
 
 
-def _rank_clusters(kmeans: KMeans, scaler: StandardScaler) -> Dict[int, str]:
+def _rank_clusters(kmeans: "KMeans", scaler: "StandardScaler") -> Dict[int, str]:
     """Rank clusters by their avg_score centroid (ascending) → assign labels."""
+    import numpy as np
+
     centres = scaler.inverse_transform(kmeans.cluster_centers_)
     # centres[:,0] = avg_score column
     order = np.argsort(centres[:, 0])  # ascending by avg score
@@ -25,12 +46,357 @@ def _rank_clusters(kmeans: KMeans, scaler: StandardScaler) -> Dict[int, str]:
     return mapping
 
 
+# ── Persisted population model ────────────────────────────────────────
+class ClusterModel:
+    """
+    Fitted scaler + centroids + rank map. predict() is plain Python over
+    three features and three centroids, so a call costs a few microseconds.
+    """
+
+    def __init__(self, mean, scale, centroids, labels, version: int = 0,
+                 n_samples: int = 0, fitted_at: Optional[str] = None, counts=None):
+        self.mean = [float(v) for v in mean]
+        self.scale = [float(v) if v else 1.0 for v in scale]
+        self.centroids = [[float(v) for v in c] for c in centroids]
+        self.labels = list(labels)  # labels[i] = level of cluster i
+        self.version = version
+        self.n_samples = n_samples
+        self.fitted_at = fitted_at
+        # Samples absorbed per centroid; sets the step size of online updates
+        if counts is None:
+            counts = [max(n_samples / max(len(self.centroids), 1), 1.0)] * len(self.centroids)
+        self.counts = [float(c) for c in counts]
+
+    def predict_cluster(self, avg_score: float, total_attempts: float, avg_time: float) -> int:
+        x = [(v - m) / s for v, m, s in zip((avg_score, total_attempts, avg_time), self.mean, self.scale)]
+        best, best_dist = 0, float("inf")
+        for i, c in enumerate(self.centroids):
+            dist = 0.0
+            for xk, ck in zip(x, c):
+                dist += (xk - ck) * (xk - ck)
+            if dist < best_dist:
+                best, best_dist = i, dist
+        return best
+
+    def predict(self, avg_score: float, total_attempts: float, avg_time: float) -> str:
+        return self.labels[self.predict_cluster(avg_score, total_attempts, avg_time)]
+
+    def predict_clusters(self, X: "np.ndarray") -> "np.ndarray":
+        """Vectorised predict_cluster; same arithmetic order so results agree exactly."""
+        import numpy as np
+
+        X = np.asarray(X, dtype=float)
+        scaled = [(X[:, k] - self.mean[k]) / self.scale[k] for k in range(len(self.mean))]
+        dists = np.empty((X.shape[0], len(self.centroids)))
+        for i, c in enumerate(self.centroids):
+            d = np.zeros(X.shape[0])
+            for k, ck in enumerate(c):
+                diff = scaled[k] - ck
+                d += diff * diff
+            dists[:, i] = d
+        return np.argmin(dists, axis=1)
+
+    def predict_many(self, X: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        return np.asarray(self.labels, dtype=object)[self.predict_clusters(X)]
+
+    def partial_fit(self, X: "np.ndarray") -> "ClusterModel":
+        """
+        Fold a mini-batch of raw feature rows into the centroids and return a
+        new model (the current one is left untouched for concurrent readers).
+        Each centroid moves to the running mean of everything assigned to it,
+        as in MiniBatchKMeans; the scaler stays fixed until the next full fit.
+        """
+        import numpy as np
+
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.mean))
+        mean, scale = np.asarray(self.mean), np.asarray(self.scale)
+        centroids = np.asarray(self.centroids)
+        counts = np.asarray(self.counts)
+        scaled = (X - mean) / scale
+        assigned = self.predict_clusters(X)
+
+        for i in range(len(centroids)):
+            members = scaled[assigned == i]
+            if len(members) == 0:
+                continue
+            counts[i] += len(members)
+            centroids[i] += (members.sum(axis=0) - len(members) * centroids[i]) / counts[i]
+
+        # Re-rank by avg_score centroid, the same rule _rank_clusters applies
+        order = np.argsort(centroids[:, 0] * scale[0] + mean[0])
+        labels = [""] * len(centroids)
+        for rank, cluster_idx in enumerate(order):
+            labels[int(cluster_idx)] = LEVEL_LABELS[rank]
+
+        return ClusterModel(
+            self.mean, self.scale, centroids, labels,
+            version=self.version,
+            n_samples=self.n_samples + len(X),
+            fitted_at=self.fitted_at,
+            counts=counts,
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "fitted_at": self.fitted_at,
+            "n_samples": self.n_samples,
+            "features": FEATURES,
+            "mean": self.mean,
+            "scale": self.scale,
+            "centroids": self.centroids,
+            "labels": self.labels,
+            "counts": self.counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ClusterModel":
+        return cls(
+            data["mean"], data["scale"], data["centroids"], data["labels"],
+            version=data.get("version", 0),
+            n_samples=data.get("n_samples", 0),
+            fitted_at=data.get("fitted_at"),
+            counts=data.get("counts"),
+        )
+
+
+def fit_cluster_model(X: "np.ndarray", n_clusters: int = 3, batch_size: int = 1024,
+                      random_state: int = 42) -> Optional[ClusterModel]:
+    """
+    Fit MiniBatchKMeans over an (n_students, 3) feature matrix.
+    Returns None when there are fewer distinct students than clusters.
+    """
+    import numpy as np
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.asarray(X, dtype=float)
+    n_clusters = min(n_clusters, len(LEVEL_LABELS))
+    if len(X) == 0 or len(np.unique(X, axis=0)) < n_clusters:
+        return None
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_clusters, batch_size=batch_size, random_state=random_state, n_init="auto"
+    )
+    kmeans.fit(X_scaled)
+
+    rank_map = _rank_clusters(kmeans, scaler)
+    return ClusterModel(
+        scaler.mean_, scaler.scale_, kmeans.cluster_centers_,
+        [rank_map[i] for i in range(n_clusters)],
+        n_samples=len(X),
+        fitted_at=datetime.utcnow().isoformat(),
+        counts=np.bincount(kmeans.labels_, minlength=n_clusters),
+    )
+
+
+def save_model(model: ClusterModel, path: str) -> ClusterModel:
+    """
+    Write the model to a temp file and atomically rename it over `path`, so
+    readers see either the old or the new version, never a partial file.
+    The version is one more than the model currently on disk.
+    """
+    current = load_model(path)
+    model.version = (current.version if current else 0) + 1
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".clusters-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(model.to_dict(), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return model
+
+
+def load_model(path: str) -> Optional[ClusterModel]:
+    try:
+        with open(path) as f:
+            return ClusterModel.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+class _ModelHolder:
+    """
+    Process-wide reference to the active model. The file is re-checked at
+    most every `cluster_model_reload_s` seconds and swapped in when it changes.
+    """
+
+    def __init__(self):
+        self._model: Optional[ClusterModel] = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[ClusterModel]:
+        now = time.monotonic()
+        if now >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                settings = get_settings()
+                self._next_check = now + settings.cluster_model_reload_s
+                self._refresh(settings.cluster_model_path)
+            finally:
+                self._lock.release()
+        return self._model
+
+    def _refresh(self, path: str) -> None:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._model, self._signature = None, None
+            return
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature != self._signature:
+            model = load_model(path)
+            if model is not None:
+                self._model = model
+            self._signature = signature
+
+    def publish(self, model: ClusterModel, path: str) -> None:
+        """Swap in a model this process just saved to `path`."""
+        with self._lock:
+            st = os.stat(path)
+            self._model = model
+            self._signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def reset(self) -> None:
+        """Forget the loaded model and re-check the file on next use."""
+        with self._lock:
+            self._model, self._signature, self._next_check = None, None, 0.0
+
+
+_holder = _ModelHolder()
+
+
+def get_active_model() -> Optional[ClusterModel]:
+    return _holder.get()
+
+
+def reload_model() -> None:
+    _holder.reset()
+
+
+# ── Online updates ────────────────────────────────────────────────────
+def _load_features(user_ids: List[int]) -> "np.ndarray":
+    """Current feature rows for the given students, from their topic totals."""
+    # Imported here: jobs imports this module and pulls in numpy/scipy
+    from database import ReadSessionLocal
+    from jobs import load_student_features
+
+    with ReadSessionLocal() as db:
+        return load_student_features(db, user_ids)[1]
+
+
+class OnlineClusterer:
+    """
+    Folds students whose attempts changed their features into the published
+    model with ClusterModel.partial_fit, off the request path.
+
+    Requests only note the student id. A background thread wakes every
+    cluster_online_flush_s, or once cluster_online_batch_size students are
+    waiting, loads each waiting student's current feature row (one row per
+    student however many attempts they made in between, so heavy users
+    aren't overweighted), starts from the newest model on disk and saves a
+    new version, which other workers pick up through the usual reload check.
+    Concurrent flushes from different workers are last-writer-wins; the
+    nightly full refit resets any drift.
+    """
+
+    def __init__(self):
+        self._pending: Set[int] = set()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def enabled(self) -> bool:
+        """Online updates need the setting on and a published model to update."""
+        return get_settings().cluster_online_updates and get_active_model() is not None
+
+    def observe(self, user_id: int) -> None:
+        """Queue a student whose features changed for the next fold."""
+        if not self.enabled():
+            return
+        with self._cond:
+            self._pending.add(user_id)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="online-clusterer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= get_settings().cluster_online_batch_size:
+                self._cond.notify()
+        if self._stopped:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            settings = get_settings()
+            with self._cond:
+                if not self._stopped and len(self._pending) < settings.cluster_online_batch_size:
+                    self._cond.wait(settings.cluster_online_flush_s)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def flush(self) -> Optional[ClusterModel]:
+        """Apply queued students now. Returns the new model, or None if nothing changed."""
+        with self._flush_lock:
+            with self._cond:
+                user_ids, self._pending = sorted(self._pending), set()
+            if not user_ids:
+                return None
+            try:
+                path = get_settings().cluster_model_path
+                base = load_model(path)
+                if base is None:
+                    return None
+                X = _load_features(user_ids)
+                if not len(X):
+                    return None
+                model = save_model(base.partial_fit(X), path)
+                _holder.publish(model, path)
+                return model
+            except Exception:
+                logger.exception("Dropped an online cluster update for %d students", len(user_ids))
+                return None
+
+    def close(self) -> None:
+        """Stop the background thread after a final flush."""
+        with self._cond:
+            self._stopped = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+online_clusterer = OnlineClusterer()
+
+
+# ── Level lookup ──────────────────────────────────────────────────────
 def get_student_level(avg_score: float, total_attempts: int, avg_time: float) -> str:
     """
-    Return student level using heuristic clustering.
-    If we have only one student we fall back to rule-based thresholds
-    (K-Means needs ≥3 samples).
+    Return student level from the fitted population model.
+    Until a model has been fitted (K-Means needs ≥3 students) we fall back
+    to rule-based thresholds.
     """
+    model = get_active_model()
+    if model is not None:
+        return model.predict(avg_score, total_attempts, avg_time)
+
     if avg_score < 40:
         return "Beginner"
     elif avg_score < 70:
@@ -39,13 +405,42 @@ def get_student_level(avg_score: float, total_attempts: int, avg_time: float) ->
         return "Advanced"
 
 
+def get_student_levels(avg_scores: "np.ndarray", total_attempts: "np.ndarray", avg_times: "np.ndarray") -> "np.ndarray":
+    """Vectorised get_student_level over arrays of students; returns an array of labels."""
+    import numpy as np
+
+    avg_scores = np.asarray(avg_scores, dtype=float)
+    model = get_active_model()
+    if model is not None:
+        X = np.column_stack([
+            avg_scores,
+            np.asarray(total_attempts, dtype=float),
+            np.asarray(avg_times, dtype=float),
+        ])
+        return model.predict_many(X)
+
+    return np.select(
+        [avg_scores < 40, avg_scores < 70],
+        ["Beginner", "Intermediate"],
+        default="Advanced",
+    )
+
+
 def cluster_students(student_stats: List[Dict]) -> Dict[int, str]:
     """
     Cluster a list of student stat dicts and return {student_id: level}.
     Each dict must have keys: student_id, avg_score, total_attempts, avg_time.
     Returns rule-based results if fewer than 3 students.
     """
-    if len(student_stats) < 3:
+    import numpy as np
+
+    X = np.array([
+        [s["avg_score"], s["total_attempts"], s.get("avg_time", 60)]
+        for s in student_stats
+    ], dtype=float).reshape(-1, len(FEATURES))
+
+    model = fit_cluster_model(X) if len(student_stats) >= 3 else None
+    if model is None:
         return {
             s["student_id"]: get_student_level(
                 s["avg_score"], s["total_attempts"], s.get("avg_time", 60)
@@ -53,22 +448,5 @@ def cluster_students(student_stats: List[Dict]) -> Dict[int, str]:
             for s in student_stats
         }
 
-    X = np.array([
-        [s["avg_score"], s["total_attempts"], s.get("avg_time", 60)]
-        for s in student_stats
-    ], dtype=float)
-
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-
-    n_clusters = min(3, len(student_stats))
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init="auto")
-    labels = kmeans.fit_predict(X_scaled)
-
-    cluster_label_map = _rank_clusters(kmeans, scaler)
-
-    result = {}
-    for i, s in enumerate(student_stats):
-        cluster = int(labels[i])
-        result[s["student_id"]] = cluster_label_map[cluster]
-    return result
+    labels = model.predict_many(X)
+    return {s["student_id"]: str(labels[i]) for i, s in enumerate(student_stats)}
@@ -1,6 +1,10 @@
 """
 Difficulty adjustment logic based on student performance.
 """
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def get_difficulty_adjustment(avg_score: float) -> str:
@@ -16,6 +20,18 @@ def get_difficulty_adjustment(avg_score: float) -> str:
         return "Maintain"
 
 
+def get_difficulty_adjustments(avg_scores: "np.ndarray") -> "np.ndarray":
+    """Vectorised get_difficulty_adjustment over an array of average scores."""
+    import numpy as np
+
+    avg_scores = np.asarray(avg_scores, dtype=float)
+    return np.select(
+        [avg_scores < 40, avg_scores >= 70],
+        ["Decrease", "Increase"],
+        default="Maintain",
+    )
+
+
 def get_next_difficulty(current_difficulty: str, adjustment: str) -> str:
     """Given current difficulty and adjustment, return next difficulty level."""
     levels = ["Beginner", "Intermediate", "Advanced"]
@@ -2,65 +2,53 @@
 Recommendation engine: picks the best topic to recommend
 based on student's weakest subject and current cluster level.
 """
-from typing import List, Dict, Optional
-from ml.clustering import get_student_level
-from ml.difficulty import get_difficulty_adjustment
+from typing import TYPE_CHECKING, List, Dict, Optional, Sequence
+from ml.clustering import get_student_level, get_student_levels
+from ml.difficulty import get_difficulty_adjustment, get_difficulty_adjustments
 
+if TYPE_CHECKING:
+    import numpy as np
 
-def generate_recommendation(
-    student_id: int,
-    attempts_data: List[Dict],
-    all_topics: List[Dict],
-) -> Dict:
-    """
-    Generate a recommendation for a student.
+DEFAULT_TOPIC = {"id": 1, "name": "Introduction"}
 
-    attempts_data: list of dicts with keys:
-        topic_id, topic_name, avg_score, attempt_count
-    all_topics: list of dicts with keys:
-        id, name
-
-    Returns dict with: student_id, current_level, recommended_topic_id,
-                       recommended_topic, difficulty_adjustment, reasoning
-    """
-    if not attempts_data:
-        # Cold start – recommend first topic
-        first_topic = all_topics[0] if all_topics else {"id": 1, "name": "Introduction"}
-        return {
-            "student_id": student_id,
-            "current_level": "Beginner",
-            "recommended_topic_id": first_topic["id"],
-            "recommended_topic": first_topic["name"],
-            "difficulty_adjustment": "Maintain",
-            "reasoning": "No prior attempts found. Starting with the first available topic.",
-        }
-
-    total_score = sum(a["avg_score"] * a["attempt_count"] for a in attempts_data)
-    total_attempts = sum(a["attempt_count"] for a in attempts_data)
-    overall_avg = total_score / total_attempts if total_attempts > 0 else 0
 
-    current_level = get_student_level(overall_avg, total_attempts, 60)
-    difficulty_adjustment = get_difficulty_adjustment(overall_avg)
+def _cold_start(student_id: int, all_topics: List[Dict]) -> Dict:
+    first_topic = all_topics[0] if all_topics else DEFAULT_TOPIC
+    return {
+        "student_id": student_id,
+        "current_level": "Beginner",
+        "recommended_topic_id": first_topic["id"],
+        "recommended_topic": first_topic["name"],
+        "difficulty_adjustment": "Maintain",
+        "reasoning": "No prior attempts found. Starting with the first available topic.",
+    }
 
-    # Find weakest topic (lowest avg_score)
-    attempted_ids = {a["topic_id"] for a in attempts_data}
-    sorted_by_score = sorted(attempts_data, key=lambda x: x["avg_score"])
-    weakest = sorted_by_score[0]
 
-    # Prefer an unattempted topic if student is doing well
+def _build_recommendation(
+    student_id: int,
+    overall_mastery: float,
+    current_level: str,
+    difficulty_adjustment: str,
+    weakest: Dict,
+    unattempted: Optional[Dict],
+) -> Dict:
+    """
+    Assemble the recommendation dict shared by the single and batch paths.
+    weakest: dict with topic_id, topic_name, mastery
+    unattempted: first topic (id, name) the student has not tried, or None
+    """
     recommended_topic_id = weakest["topic_id"]
     recommended_topic_name = weakest["topic_name"]
     reasoning_parts = [
-        f"Overall average score: {overall_avg:.1f}%.",
+        f"Overall mastery: {overall_mastery:.1f}% (recent attempts weigh most).",
         f"Current level determined as {current_level}.",
     ]
 
     if difficulty_adjustment == "Increase":
-        # Find a topic not yet attempted
-        unattempted = [t for t in all_topics if t["id"] not in attempted_ids]
+        # Prefer an unattempted topic if student is doing well
         if unattempted:
-            recommended_topic_id = unattempted[0]["id"]
-            recommended_topic_name = unattempted[0]["name"]
+            recommended_topic_id = unattempted["id"]
+            recommended_topic_name = unattempted["name"]
             reasoning_parts.append(
                 f"You are performing well! Exploring new topic: {recommended_topic_name}."
             )
@@ -70,7 +58,7 @@ def generate_recommendation(
             )
     else:
         reasoning_parts.append(
-            f"Weakest topic '{weakest['topic_name']}' scored {weakest['avg_score']:.1f}%."
+            f"Weakest topic '{weakest['topic_name']}' is at {weakest['mastery']:.1f}% mastery."
             " Recommended for improvement."
         )
 
@@ -84,3 +72,144 @@ def generate_recommendation(
         "difficulty_adjustment": difficulty_adjustment,
         "reasoning": " ".join(reasoning_parts),
     }
+
+
+def generate_recommendation(
+    student_id: int,
+    attempts_data: List[Dict],
+    all_topics: List[Dict],
+) -> Dict:
+    """
+    Generate a recommendation for a student.
+
+    attempts_data: list of dicts with keys:
+        topic_id, topic_name, mastery, mastery_weight, attempt_count, time_sum
+        (mastery is the topic's time-decayed average score, see stats.py;
+        time_sum the seconds spent on the topic's attempts)
+    all_topics: list of dicts with keys:
+        id, name
+
+    Returns dict with: student_id, current_level, recommended_topic_id,
+                       recommended_topic, difficulty_adjustment, reasoning
+    """
+    if not attempts_data:
+        # Cold start – recommend first topic
+        return _cold_start(student_id, all_topics)
+
+    total_score = sum(a["mastery"] * a["mastery_weight"] for a in attempts_data)
+    total_weight = sum(a["mastery_weight"] for a in attempts_data)
+    total_attempts = sum(a["attempt_count"] for a in attempts_data)
+    total_time = sum(a["time_sum"] for a in attempts_data)
+    overall_mastery = total_score / total_weight if total_weight > 0 else 0
+    # The cluster model is fitted on real average times (jobs.load_student_features)
+    avg_time = total_time / total_attempts if total_attempts > 0 else 60
+
+    current_level = get_student_level(overall_mastery, total_attempts, avg_time)
+    difficulty_adjustment = get_difficulty_adjustment(overall_mastery)
+
+    # Find weakest topic (lowest mastery)
+    attempted_ids = {a["topic_id"] for a in attempts_data}
+    weakest = sorted(attempts_data, key=lambda x: x["mastery"])[0]
+    unattempted = next((t for t in all_topics if t["id"] not in attempted_ids), None)
+
+    return _build_recommendation(
+        student_id, overall_mastery, current_level, difficulty_adjustment, weakest, unattempted
+    )
+
+
+def generate_recommendations_batch(
+    student_ids: Sequence[int],
+    masteries,
+    mastery_weights,
+    attempt_counts,
+    time_sums,
+    all_topics: List[Dict],
+    chunk_size: int = 10_000,
+) -> List[Dict]:
+    """
+    Generate recommendations for many students at once.
+
+    masteries, mastery_weights, attempt_counts, time_sums:
+        (n_students, n_topics) dense arrays or scipy sparse matrices (the
+        per-topic values generate_recommendation gets in attempts_data); row i belongs to
+        student_ids[i] and column j to all_topics[j].
+    all_topics: list of dicts with keys id, name, in the same order the
+        single-student path sees them (and attempts_data sorted the same way).
+
+    Produces exactly what generate_recommendation returns for each student.
+    Rows are processed in chunks so sparse inputs are densified piecewise.
+    """
+    import numpy as np
+
+    n_students = len(student_ids)
+    n_topics = len(all_topics)
+    topic_ids = [t["id"] for t in all_topics]
+    topic_names = [t["name"] for t in all_topics]
+    results: List[Dict] = []
+
+    for start in range(0, n_students, chunk_size):
+        stop = min(start + chunk_size, n_students)
+        topic_mastery = _dense_rows(masteries, start, stop)
+        weights = _dense_rows(mastery_weights, start, stop)
+        counts = _dense_rows(attempt_counts, start, stop)
+        times = _dense_rows(time_sums, start, stop)
+        attempted = counts > 0
+
+        mastery = np.where(attempted, topic_mastery, 0.0)
+
+        # Accumulate column by column so floating-point results match the
+        # left-to-right sum() in generate_recommendation bit for bit.
+        weighted = mastery * weights
+        total_score = np.zeros(stop - start)
+        total_weight = np.zeros(stop - start)
+        for j in range(n_topics):
+            total_score += weighted[:, j]
+            total_weight += weights[:, j]
+        total_attempts = counts.sum(axis=1).astype(np.int64)
+        total_time = times.sum(axis=1)  # whole seconds, so the sum is exact
+        has_attempts = total_attempts > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            overall_mastery = np.where(total_weight > 0, total_score / total_weight, 0.0)
+            avg_time = np.where(has_attempts, total_time / total_attempts, 60.0)
+
+        levels = get_student_levels(overall_mastery, total_attempts, avg_time)
+        adjustments = get_difficulty_adjustments(overall_mastery)
+
+        # First lowest mastery among attempted topics; first unattempted topic
+        weakest_idx = np.argmin(np.where(attempted, mastery, np.inf), axis=1)
+        unattempted = ~attempted
+        has_unattempted = unattempted.any(axis=1)
+        first_unattempted_idx = np.argmax(unattempted, axis=1)
+
+        for i in range(stop - start):
+            student_id = student_ids[start + i]
+            if not has_attempts[i]:
+                results.append(_cold_start(student_id, all_topics))
+                continue
+            w = int(weakest_idx[i])
+            weakest = {"topic_id": topic_ids[w], "topic_name": topic_names[w], "mastery": float(mastery[i, w])}
+            nxt = None
+            if has_unattempted[i]:
+                u = int(first_unattempted_idx[i])
+                nxt = {"id": topic_ids[u], "name": topic_names[u]}
+            results.append(
+                _build_recommendation(
+                    student_id,
+                    float(overall_mastery[i]),
+                    str(levels[i]),
+                    str(adjustments[i]),
+                    weakest,
+                    nxt,
+                )
+            )
+    return results
+
+
+def _dense_rows(matrix, start: int, stop: int) -> "np.ndarray":
+    """Return rows [start, stop) of a dense or scipy sparse matrix as a float ndarray."""
+    import numpy as np
+
+    block = matrix[start:stop]
+    if hasattr(block, "toarray"):
+        block = block.toarray()
+    return np.asarray(block, dtype=float)
@@ -2,7 +2,7 @@ import json
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean,
-    DateTime, ForeignKey, Text
+    DateTime, ForeignKey, Text, Index
 )
 from sqlalchemy.orm import relationship
 from database import Base
@@ -20,6 +20,7 @@ class User(Base):
 
     attempts = relationship("QuizAttempt", back_populates="user")
     recommendations = relationship("Recommendation", back_populates="user")
+    topic_stats = relationship("UserTopicStat", back_populates="user")
 
 
 class Topic(Base):
@@ -61,6 +62,11 @@ class Question(Base):
 
     quiz = relationship("Quiz", back_populates="questions")
 
+    __table_args__ = (
+        # Answer keys and quiz detail: a quiz's questions in id order
+        Index("ix_questions_quiz_id_id", "quiz_id", "id"),
+    )
+
     @property
     def options(self):
         return json.loads(self.options_json)
@@ -86,6 +92,12 @@ class QuizAttempt(Base):
     user = relationship("User", back_populates="attempts")
     quiz = relationship("Quiz", back_populates="attempts")
 
+    __table_args__ = (
+        # /attempts/my keyset pages and progress' recent attempts
+        Index("ix_quiz_attempts_user_id_attempted_at_id", "user_id", "attempted_at", "id"),
+        Index("ix_quiz_attempts_quiz_id", "quiz_id"),
+    )
+
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
@@ -100,3 +112,42 @@ class Recommendation(Base):
 
     user = relationship("User", back_populates="recommendations")
     topic = relationship("Topic", back_populates="recommendations")
+
+    __table_args__ = (
+        # History pages and the latest-recommendation dedupe lookup
+        Index("ix_recommendations_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class UserTopicStat(Base):
+    """Running per-user, per-topic totals maintained alongside quiz_attempts."""
+    __tablename__ = "user_topic_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), primary_key=True)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    time_sum = Column(Integer, nullable=False, default=0)  # seconds
+    # Time-decayed average score = mastery_sum / mastery_weight (see stats.py)
+    mastery_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    mastery_weight = Column(Float, nullable=False, default=0.0, server_default="0")
+    mastery_at = Column(Float, nullable=False, default=0.0, server_default="0")  # days since stats.MASTERY_EPOCH
+    last_attempt_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", back_populates="topic_stats")
+    topic = relationship("Topic")
+
+
+class DistributionBucket(Base):
+    """
+    One bucket of a fixed-edge histogram of attempt scores or times for a
+    quiz or a topic (see distributions.py). Histograms with the same edges
+    merge by adding counts, so every attempt is a single increment.
+    """
+    __tablename__ = "distribution_buckets"
+
+    scope = Column(String(10), primary_key=True)   # quiz / topic
+    scope_id = Column(Integer, primary_key=True)
+    metric = Column(String(10), primary_key=True)  # score / time
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
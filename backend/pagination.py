@@ -0,0 +1,59 @@
+"""
+Keyset (cursor) pagination for newest-first history lists.
+
+Pages are ordered by (timestamp DESC, id DESC) and the next page starts
+strictly after the last row returned, so each page is an index range scan
+no matter how deep the client pages. The cursor handed to clients is an
+opaque base64 token; list bodies stay plain JSON arrays and the token for
+the next page travels in the X-Next-Cursor response header (absent on the
+last page).
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw = f"{sort_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        sort_value, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    query: Query,
+    sort_col,
+    id_col,
+    cursor: Optional[str],
+    limit: int,
+    key: Callable[[object], Tuple[datetime, int]],
+) -> Tuple[List, Optional[str]]:
+    """
+    Return one newest-first page of `query` and the cursor for the next one.
+    `key` extracts (sort value, id) from a result row.
+    """
+    if cursor:
+        query = query.filter(tuple_(sort_col, id_col) < tuple_(*decode_cursor(cursor)))
+    rows = query.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,18 @@
+"""
+bcrypt primitives. Kept free of app imports so hashing worker processes
+start quickly and only load bcrypt.
+"""
+import bcrypt
+
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    pwd_bytes = password.encode('utf-8')
+    salt = bcrypt.gensalt(rounds=rounds)
+    hashed_password = bcrypt.hashpw(password=pwd_bytes, salt=salt)
+    return hashed_password.decode('utf-8')
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    password_byte_enc = plain.encode('utf-8')
+    hashed_password_byte_enc = hashed.encode('utf-8')
+    return bcrypt.checkpw(password=password_byte_enc, hashed_password=hashed_password_byte_enc)
@@ -0,0 +1,128 @@
+"""
+Query-plan regression check for the hot read paths.
+
+Each entry below mirrors a query the API runs on every request of some
+endpoint. check_query_plans() EXPLAINs them on the configured database and
+reports any that scan a whole table instead of using an index. Run it via
+`python manage.py check-query-plans`, which exits non-zero on a regression.
+
+PostgreSQL happily seq-scans small tables, so the check disables seq scans
+for its session: a plan that still scans means no usable index exists.
+"""
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.engine import Connection
+import models
+
+_CURSOR = (datetime(2024, 1, 1), 1_000_000)
+
+
+class PlanResult(NamedTuple):
+    name: str
+    plan: List[str]
+    full_scans: List[str]
+
+
+def _attempts_page():
+    a = models.QuizAttempt
+    return (
+        select(a)
+        .where(a.user_id == 1, tuple_(a.attempted_at, a.id) < tuple_(*_CURSOR))
+        .order_by(a.attempted_at.desc(), a.id.desc())
+        .limit(51)
+    )
+
+
+def _recent_attempts():
+    a = models.QuizAttempt
+    return select(a).where(a.user_id == 1).order_by(a.attempted_at.desc(), a.id.desc()).limit(10)
+
+
+def _quiz_attempt_count():
+    a = models.QuizAttempt
+    return select(func.count(a.id)).where(a.quiz_id == 1)
+
+
+def _answer_keys():
+    return (
+        select(models.Quiz.id, models.Quiz.topic_id, models.Question.correct_answer)
+        .outerjoin(models.Question, models.Question.quiz_id == models.Quiz.id)
+        .where(models.Quiz.id.in_([1, 2, 3]))
+        .order_by(models.Quiz.id, models.Question.id)
+    )
+
+
+def _quiz_questions():
+    q = models.Question
+    return select(q.id, q.text, q.options_json).where(q.quiz_id == 1).order_by(q.id)
+
+
+def _recommendation_history():
+    r = models.Recommendation
+    return (
+        select(r, models.Topic.name)
+        .join(models.Topic, models.Topic.id == r.recommended_topic_id)
+        .where(r.user_id == 1, tuple_(r.created_at, r.id) < tuple_(*_CURSOR))
+        .order_by(r.created_at.desc(), r.id.desc())
+        .limit(11)
+    )
+
+
+def _latest_recommendation():
+    r = models.Recommendation
+    return select(r.id, r.created_at).where(r.user_id == 1).order_by(r.created_at.desc(), r.id.desc()).limit(1)
+
+
+def _user_topic_stats():
+    s = models.UserTopicStat
+    return (
+        select(s.topic_id, models.Topic.name, s.score_sum, s.attempt_count)
+        .join(models.Topic, models.Topic.id == s.topic_id)
+        .where(s.user_id == 1)
+        .order_by(s.topic_id)
+    )
+
+
+def _distribution_buckets():
+    b = models.DistributionBucket
+    return select(b.metric, b.bucket, b.count).where(b.scope == "quiz", b.scope_id == 1)
+
+
+HOT_QUERIES: Dict[str, Callable] = {
+    "attempts page (/attempts/my)": _attempts_page,
+    "recent attempts (/progress)": _recent_attempts,
+    "attempts per quiz": _quiz_attempt_count,
+    "answer keys (scoring)": _answer_keys,
+    "quiz questions (/quizzes/{id})": _quiz_questions,
+    "recommendation history page": _recommendation_history,
+    "latest recommendation (dedupe)": _latest_recommendation,
+    "user topic stats (/progress, /recommendations)": _user_topic_stats,
+    "distribution buckets (/analytics)": _distribution_buckets,
+}
+
+_SQLITE_SCAN = re.compile(r"\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)")
+_PG_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _explain(conn: Connection, stmt) -> List[str]:
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+
+
+def _full_scans(dialect: str, plan: List[str]) -> List[str]:
+    pattern = _SQLITE_SCAN if dialect == "sqlite" else _PG_SCAN
+    return [m.group(1) for line in plan for m in pattern.finditer(line)]
+
+
+def check_query_plans(conn: Connection) -> List[PlanResult]:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+    results = []
+    for name, build in HOT_QUERIES.items():
+        plan = _explain(conn, build())
+        results.append(PlanResult(name, plan, _full_scans(conn.dialect.name, plan)))
+    return results
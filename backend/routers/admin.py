@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database import ReadSessionLocal
+from auth import require_admin
+from config import get_settings
+import export
+import schemas
+
+settings = get_settings()
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+_EXPORT_RESPONSES = {200: {"content": {media_type: {} for media_type in export.FORMATS.values()}}}
+
+
+def _stream(fmt: str, **filters) -> Iterator[bytes]:
+    # The generator owns its session: request-scoped dependencies are torn
+    # down before a streamed body is sent
+    db = ReadSessionLocal()
+    try:
+        yield from export.iter_attempts(db, fmt, chunk_size=settings.export_chunk_size, **filters)
+    finally:
+        db.close()
+
+
+def _export_response(fmt: str, **filters) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(fmt, **filters),
+        media_type=export.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="quiz_attempts.{fmt}"'},
+    )
+
+
+@router.get("/exports/attempts", response_class=StreamingResponse, responses=_EXPORT_RESPONSES)
+def export_attempts(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    since_id: Optional[int] = Query(None, ge=0, description="Only attempts with a larger id"),
+    start: Optional[datetime] = Query(None, alias="from", description="attempted_at >= from"),
+    end: Optional[datetime] = Query(None, alias="to", description="attempted_at < to"),
+    limit: Optional[int] = Query(None, ge=1),
+    admin: schemas.UserIdentity = Depends(require_admin),
+):
+    """Stream every matching attempt, joined with its quiz and topic, in attempt id order."""
+    # Normalised here so a bad bound fails before the streamed body starts
+    try:
+        start, end = export.naive_utc(start), export.naive_utc(end)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return _export_response(fmt, since_id=since_id, start=start, end=end, limit=limit)
+
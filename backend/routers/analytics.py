@@ -0,0 +1,90 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import get_async_read_db, get_read_db
+from auth import get_current_identity, get_current_identity_async
+from catalog import catalog
+import distributions
+import models
+import schemas
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+def _percentiles(
+    db: Session, scope: str, scope_id: int, score: Optional[float], time_taken_s: Optional[int]
+) -> schemas.PercentileOut:
+    snapshot = catalog.get(db)
+    known = snapshot.quizzes_by_id if scope == "quiz" else snapshot.topics_by_id
+    # Fall back to the DB for rows created by another worker since our snapshot
+    if scope_id not in known and db.get(models.Quiz if scope == "quiz" else models.Topic, scope_id) is None:
+        raise HTTPException(status_code=404, detail=f"{scope.capitalize()} not found")
+
+    histograms = distributions.get_histograms(db, scope, scope_id)
+    scores = histograms["score"]
+    return schemas.PercentileOut(
+        scope=scope,
+        scope_id=scope_id,
+        attempts=sum(scores.values()),
+        score=score,
+        score_percentile=(
+            None if score is None
+            else distributions.percentile_rank(distributions.SCORE_EDGES, scores, score)
+        ),
+        time_taken_s=time_taken_s,
+        time_percentile=(
+            None if time_taken_s is None
+            else distributions.percentile_rank(distributions.TIME_EDGES, histograms["time"], time_taken_s)
+        ),
+    )
+
+
+@router.get("/quizzes/{quiz_id}/percentiles", response_model=schemas.PercentileOut)
+def get_quiz_percentiles(
+    quiz_id: int,
+    score: Optional[float] = Query(None, ge=0, le=100),
+    time_taken_s: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    return _percentiles(db, "quiz", quiz_id, score, time_taken_s)
+
+
+@router.get("/topics/{topic_id}/percentiles", response_model=schemas.PercentileOut)
+def get_topic_percentiles(
+    topic_id: int,
+    score: Optional[float] = Query(None, ge=0, le=100),
+    time_taken_s: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    return _percentiles(db, "topic", topic_id, score, time_taken_s)
+
+
+# ── Async variants (used when DATABASE_URL names an async driver) ─────
+async_router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@async_router.get("/quizzes/{quiz_id}/percentiles", response_model=schemas.PercentileOut,
+                  name="get_quiz_percentiles")
+async def get_quiz_percentiles_async(
+    quiz_id: int,
+    score: Optional[float] = Query(None, ge=0, le=100),
+    time_taken_s: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    return await db.run_sync(_percentiles, "quiz", quiz_id, score, time_taken_s)
+
+
+@async_router.get("/topics/{topic_id}/percentiles", response_model=schemas.PercentileOut,
+                  name="get_topic_percentiles")
+async def get_topic_percentiles_async(
+    topic_id: int,
+    score: Optional[float] = Query(None, ge=0, le=100),
+    time_taken_s: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    return await db.run_sync(_percentiles, "topic", topic_id, score, time_taken_s)
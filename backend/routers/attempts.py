@@ -1,43 +1,43 @@
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from database import get_async_db, get_async_read_db, get_db, get_read_db
+from auth import get_current_identity, get_current_identity_async
+from cache import recommendation_cache
+from config import get_settings
+from ml.clustering import online_clusterer
+from pagination import keyset_page, set_next_cursor
+import distributions
 import models
 import schemas
+import scoring
+import stats
 
 router = APIRouter(prefix="/attempts", tags=["Attempts"])
+settings = get_settings()
 
+_ATTEMPT_OUT_FIELDS = ("quiz_id", "score", "total_questions", "correct_answers", "time_taken_s", "attempted_at")
 
-@router.post("", response_model=schemas.AttemptOut)
-def submit_attempt(
-    data: schemas.AttemptSubmit,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    quiz = db.query(models.Quiz).filter(models.Quiz.id == data.quiz_id).first()
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
 
-    questions = quiz.questions
-    if not questions:
-        raise HTTPException(status_code=400, detail="Quiz has no questions")
+def _submit_attempt(db: Session, user_id: int, data: schemas.AttemptSubmit) -> schemas.AttemptOut:
+    # Scored against the compiled answer key; no quiz or question rows are
+    # loaded once the key is cached
+    key = scoring.get_answer_key(db, data.quiz_id)
+    error = scoring.validate_answers(key, data.answers)
+    if error is not None:
+        raise HTTPException(status_code=404 if key is None else 400, detail=error)
 
-    if len(data.answers) != len(questions):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Expected {len(questions)} answers, got {len(data.answers)}",
-        )
-
-    correct = sum(
-        1 for q, a in zip(questions, data.answers) if q.correct_answer == a
-    )
-    total = len(questions)
+    correct = int(scoring.score_answers(key, [data.answers])[0])
+    total = key.question_count
     score = round((correct / total) * 100, 2)
 
     attempt = models.QuizAttempt(
-        user_id=current_user.id,
-        quiz_id=quiz.id,
+        user_id=user_id,
+        quiz_id=data.quiz_id,
         score=score,
         total_questions=total,
         correct_answers=correct,
@@ -45,19 +45,172 @@ def submit_attempt(
         answers_json=json.dumps(data.answers),
     )
     db.add(attempt)
+    db.flush()
+    stats.record_attempt(db, attempt, key.topic_id)
+    distributions.record_attempt(db, attempt, key.topic_id)
+    # Built before the commit expires the instance, so reading it back
+    # doesn't open a second write transaction
+    out = schemas.AttemptOut.model_validate(attempt)
     db.commit()
-    db.refresh(attempt)
-    return attempt
+    recommendation_cache.invalidate(user_id)
+
+    online_clusterer.observe(user_id)  # folded in by a background thread
+    return out
+
+
+def _submit_attempt_batch(
+    db: Session, user_id: int, items: List[schemas.AttemptBatchItem]
+) -> schemas.AttemptBatchOut:
+    if len(items) > settings.attempt_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.attempt_batch_max} attempts per batch, got {len(items)}",
+        )
+
+    keys = scoring.get_answer_keys(db, (item.quiz_id for item in items))
+    results: List[Optional[schemas.AttemptBatchResult]] = [None] * len(items)
+
+    # Score every valid submission to the same quiz in one array comparison
+    received_at = datetime.utcnow()
+    latest_allowed = received_at + timedelta(seconds=settings.attempt_clock_skew_s)
+    by_quiz: Dict[int, List[int]] = {}
+    for i, item in enumerate(items):
+        key = keys.get(item.quiz_id)
+        error = scoring.validate_answers(key, item.answers)
+        if error is None and item.attempted_at is not None and item.attempted_at > latest_allowed:
+            # A future timestamp would sit at the top of history and pin mastery
+            error = "attempted_at is in the future"
+        if error is not None:
+            results[i] = schemas.AttemptBatchResult(index=i, ok=False, error=error)
+        else:
+            by_quiz.setdefault(item.quiz_id, []).append(i)
+
+    rows, accepted = [], []
+    for quiz_id, indexes in by_quiz.items():
+        key = keys[quiz_id]
+        total = key.question_count
+        correct_counts = scoring.score_answers(key, [items[i].answers for i in indexes])
+        for i, correct in zip(indexes, correct_counts.tolist()):
+            item = items[i]
+            rows.append({
+                "user_id": user_id,
+                "quiz_id": quiz_id,
+                "score": round((correct / total) * 100, 2),
+                "total_questions": total,
+                "correct_answers": correct,
+                "time_taken_s": item.time_taken_s,
+                "answers_json": json.dumps(item.answers),
+                "attempted_at": item.attempted_at or received_at,
+            })
+            accepted.append(i)
+
+    if rows:
+        attempt = models.QuizAttempt
+        ids = db.scalars(
+            insert(attempt).returning(attempt.id, sort_by_parameter_order=True), rows
+        ).all()
+        stats.record_attempts(db, user_id, (
+            (keys[row["quiz_id"]].topic_id, row["score"], row["time_taken_s"], row["attempted_at"])
+            for row in rows
+        ))
+        distributions.record_attempts(db, (
+            (row["quiz_id"], keys[row["quiz_id"]].topic_id, row["score"], row["time_taken_s"])
+            for row in rows
+        ))
+        db.commit()
+        recommendation_cache.invalidate(user_id)
+        online_clusterer.observe(user_id)
+
+        for i, attempt_id, row in zip(accepted, ids, rows):
+            out = schemas.AttemptOut(id=attempt_id, **{k: row[k] for k in _ATTEMPT_OUT_FIELDS})
+            results[i] = schemas.AttemptBatchResult(index=i, ok=True, attempt=out)
+
+    return schemas.AttemptBatchOut(
+        accepted=len(rows),
+        rejected=len(items) - len(rows),
+        results=results,
+    )
+
+
+def _my_attempts(
+    db: Session, user_id: int, cursor: Optional[str], limit: int
+) -> Tuple[List[schemas.AttemptOut], Optional[str]]:
+    attempt = models.QuizAttempt
+    attempts, next_cursor = keyset_page(
+        db.query(attempt).filter(attempt.user_id == user_id),
+        attempt.attempted_at,
+        attempt.id,
+        cursor,
+        limit,
+        key=lambda a: (a.attempted_at, a.id),
+    )
+    return [schemas.AttemptOut.model_validate(a) for a in attempts], next_cursor
+
+
+@router.post("", response_model=schemas.AttemptOut)
+def submit_attempt(
+    data: schemas.AttemptSubmit,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    return _submit_attempt(db, current_user.id, data)
+
+
+@router.post("/batch", response_model=schemas.AttemptBatchOut)
+def submit_attempt_batch(
+    data: schemas.AttemptBatchSubmit,
+    db: Session = Depends(get_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    # Offline/classroom sync: one quiz lookup, one INSERT and one commit for the
+    # whole batch; invalid items are reported without failing the rest
+    return _submit_attempt_batch(db, current_user.id, data.attempts)
 
 
 @router.get("/my", response_model=list[schemas.AttemptOut])
 def my_attempts(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.attempts_page_size, ge=1, le=settings.page_size_max),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
 ):
-    return (
-        db.query(models.QuizAttempt)
-        .filter(models.QuizAttempt.user_id == current_user.id)
-        .order_by(models.QuizAttempt.attempted_at.desc())
-        .all()
-    )
+    # Newest first; the next page's cursor is returned in X-Next-Cursor
+    attempts, next_cursor = _my_attempts(db, current_user.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return attempts
+
+
+# ── Async variants (used when DATABASE_URL names an async driver) ─────
+async_router = APIRouter(prefix="/attempts", tags=["Attempts"])
+
+
+@async_router.post("", response_model=schemas.AttemptOut, name="submit_attempt")
+async def submit_attempt_async(
+    data: schemas.AttemptSubmit,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    return await db.run_sync(_submit_attempt, current_user.id, data)
+
+
+@async_router.post("/batch", response_model=schemas.AttemptBatchOut, name="submit_attempt_batch")
+async def submit_attempt_batch_async(
+    data: schemas.AttemptBatchSubmit,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    return await db.run_sync(_submit_attempt_batch, current_user.id, data.attempts)
+
+
+@async_router.get("/my", response_model=list[schemas.AttemptOut], name="my_attempts")
+async def my_attempts_async(
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.attempts_page_size, ge=1, le=settings.page_size_max),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    attempts, next_cursor = await db.run_sync(_my_attempts, current_user.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return attempts
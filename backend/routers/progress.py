@@ -1,66 +1,101 @@
-from typing import List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from database import get_async_read_db, get_read_db
+from auth import get_current_identity, get_current_identity_async
+from config import get_settings
+from fastjson import FastJSONResponse
 from ml.clustering import get_student_level
 import models
 import schemas
+import stats
 
 router = APIRouter(prefix="/progress", tags=["Progress"])
+settings = get_settings()
 
 
-@router.get("/{student_id}", response_model=schemas.ProgressOut)
-def get_progress(
-    student_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    user = db.query(models.User).filter(models.User.id == student_id).first()
-    if not user:
+def _get_progress(db: Session, student_id: int) -> FastJSONResponse:
+    """
+    ProgressOut built as plain data from row tuples and encoded once;
+    float fields go through float() as the model would coerce them.
+    """
+    exists = db.query(models.User.id).filter(models.User.id == student_id).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    attempts = (
-        db.query(models.QuizAttempt)
-        .filter(models.QuizAttempt.user_id == student_id)
-        .order_by(models.QuizAttempt.attempted_at.desc())
-        .all()
-    )
-
-    total_attempts = len(attempts)
-    avg_score = sum(a.score for a in attempts) / total_attempts if total_attempts > 0 else 0
-    avg_time = sum(a.time_taken_s for a in attempts) / total_attempts if total_attempts > 0 else 60
+    topic_stats = stats.get_user_topic_stats(db, student_id)
 
-    current_level = get_student_level(avg_score, total_attempts, avg_time)
+    terms = stats.mastery_terms(topic_stats)
+    total_attempts = sum(s.attempt_count for s in topic_stats)
+    total_score = sum(s.score_sum for s in topic_stats)
+    total_time = sum(s.time_sum for s in topic_stats)
+    avg_score = total_score / total_attempts if total_attempts > 0 else 0
+    avg_time = total_time / total_attempts if total_attempts > 0 else 60
+    mastery = stats.overall_mastery(terms)
 
-    # Per-topic aggregation
-    topic_data: dict[int, dict] = {}
-    for attempt in attempts:
-        tid = attempt.quiz.topic_id
-        tname = attempt.quiz.topic.name
-        if tid not in topic_data:
-            topic_data[tid] = {"topic_id": tid, "topic_name": tname, "scores": [], "attempts": 0}
-        topic_data[tid]["scores"].append(attempt.score)
-        topic_data[tid]["attempts"] += 1
+    current_level = get_student_level(mastery, total_attempts, avg_time)
 
     topic_progress = [
-        schemas.TopicProgress(
-            topic_id=v["topic_id"],
-            topic_name=v["topic_name"],
-            avg_score=round(sum(v["scores"]) / len(v["scores"]), 2),
-            attempts=v["attempts"],
+        {
+            "topic_id": s.topic_id,
+            "topic_name": s.topic_name,
+            "avg_score": float(round(s.score_sum / s.attempt_count, 2)),
+            "mastery": float(round(topic_mastery, 2)),
+            "attempts": s.attempt_count,
+        }
+        for s, (topic_mastery, _) in zip(topic_stats, terms)
+    ]
+
+    attempt = models.QuizAttempt
+    recent_attempts = [
+        {
+            "id": id_,
+            "quiz_id": quiz_id,
+            "score": float(score),
+            "total_questions": total_questions,
+            "correct_answers": correct_answers,
+            "time_taken_s": time_taken_s,
+            "attempted_at": attempted_at,
+        }
+        for id_, quiz_id, score, total_questions, correct_answers, time_taken_s, attempted_at in (
+            db.query(
+                attempt.id, attempt.quiz_id, attempt.score, attempt.total_questions,
+                attempt.correct_answers, attempt.time_taken_s, attempt.attempted_at,
+            )
+            .filter(attempt.user_id == student_id)
+            .order_by(attempt.attempted_at.desc(), attempt.id.desc())
+            .limit(settings.progress_recent_attempts)
         )
-        for v in topic_data.values()
     ]
 
-    recent_attempts = attempts[:10]
+    return FastJSONResponse({
+        "student_id": student_id,
+        "total_attempts": total_attempts,
+        "avg_score": float(round(avg_score, 2)),
+        "mastery": float(round(mastery, 2)),
+        "current_level": current_level,
+        "topic_progress": topic_progress,
+        "recent_attempts": recent_attempts,
+    })
+
+
+@router.get("/{student_id}", response_model=schemas.ProgressOut)
+def get_progress(
+    student_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    return _get_progress(db, student_id)
+
 
-    return schemas.ProgressOut(
-        student_id=student_id,
-        total_attempts=total_attempts,
-        avg_score=round(avg_score, 2),
-        current_level=current_level,
-        topic_progress=topic_progress,
-        recent_attempts=recent_attempts,
-    )
+# ── Async variants (used when DATABASE_URL names an async driver) ─────
+async_router = APIRouter(prefix="/progress", tags=["Progress"])
+
+
+@async_router.get("/{student_id}", response_model=schemas.ProgressOut, name="get_progress")
+async def get_progress_async(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    return await db.run_sync(_get_progress, student_id)
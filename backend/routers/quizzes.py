@@ -1,76 +1,119 @@
+import hashlib
 import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from database import call_after_commit, get_async_read_db, get_db, get_read_db
+from auth import get_current_identity
+from cache import quiz_detail_cache
+from catalog import catalog
+from fastjson import FastJSONResponse, dumps
 import models
 import schemas
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
 
 
+def _find_quizzes(db: Session, topic_id: Optional[int], difficulty: Optional[str]) -> Response:
+    # Served as pre-encoded catalog bytes; response_model only documents the shape
+    return FastJSONResponse(catalog.get(db).quizzes_json(topic_id, difficulty))
+
+
 @router.get("", response_model=List[schemas.QuizOut])
 def list_quizzes(
     topic_id: Optional[int] = Query(None),
     difficulty: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    q = db.query(models.Quiz)
-    if topic_id:
-        q = q.filter(models.Quiz.topic_id == topic_id)
-    if difficulty:
-        q = q.filter(models.Quiz.difficulty_level == difficulty)
-    quizzes = q.all()
-
-    result = []
-    for quiz in quizzes:
-        out = schemas.QuizOut(
-            id=quiz.id,
-            title=quiz.title,
-            topic_id=quiz.topic_id,
-            topic=quiz.topic,
-            difficulty_level=quiz.difficulty_level,
-            description=quiz.description,
-            question_count=len(quiz.questions),
-        )
-        result.append(out)
-    return result
+    return _find_quizzes(db, topic_id, difficulty)
 
 
-@router.get("/{quiz_id}", response_model=schemas.QuizDetail)
-def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
-    quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-
-    questions_out = []
-    for q in quiz.questions:
-        questions_out.append(
-            schemas.QuestionOut(
-                id=q.id,
-                text=q.text,
-                options=json.loads(q.options_json),
-            )
-        )
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
 
-    return schemas.QuizDetail(
-        id=quiz.id,
-        title=quiz.title,
-        topic_id=quiz.topic_id,
-        topic=quiz.topic,
-        difficulty_level=quiz.difficulty_level,
-        description=quiz.description,
-        question_count=len(quiz.questions),
-        questions=questions_out,
+
+def _serialize_quiz_detail(db: Session, quiz_id: int) -> Optional[tuple]:
+    """Build the public quiz detail (no answer key) as JSON bytes plus a strong ETag."""
+    quiz = catalog.get(db).quizzes_by_id.get(quiz_id)
+    if quiz is None:
+        quiz_row = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
+        if quiz_row is None:
+            return None
+        catalog.bump()  # created by another worker since our snapshot
+        quiz = catalog.get(db).quizzes_by_id[quiz_id]
+
+    rows = (
+        db.query(models.Question.id, models.Question.text, models.Question.options_json)
+        .filter(models.Question.quiz_id == quiz_id)
+        .order_by(models.Question.id)
+        .all()
     )
+    # QuizDetail field order: the QuizOut fields, then questions
+    detail = dict(quiz, question_count=len(rows))
+    detail["questions"] = [
+        {"id": id_, "text": text, "options": json.loads(options_json)} for id_, text, options_json in rows
+    ]
+    body = dumps(detail)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
+
+
+# Edits committed in this process drop the affected bodies (see
+# call_after_commit); other workers' copies expire after QUIZ_DETAIL_CACHE_TTL_S
+@event.listens_for(models.Question, "after_insert")
+@event.listens_for(models.Question, "after_update")
+@event.listens_for(models.Question, "after_delete")
+def _on_question_change(mapper, connection, question):
+    call_after_commit(question, quiz_detail_cache.invalidate, question.quiz_id)
+
+
+@event.listens_for(models.Quiz, "after_update")
+@event.listens_for(models.Quiz, "after_delete")
+def _on_quiz_change(mapper, connection, quiz):
+    call_after_commit(quiz, catalog.bump)  # the detail body is built from the catalog's quiz entry
+    call_after_commit(quiz, quiz_detail_cache.invalidate, quiz.id)
+
+
+@event.listens_for(models.Topic, "after_update")
+@event.listens_for(models.Topic, "after_delete")
+def _on_topic_change(mapper, connection, topic):
+    call_after_commit(topic, catalog.bump)
+    call_after_commit(topic, quiz_detail_cache.clear)  # every quiz body embeds its topic
+
+
+def _quiz_detail_response(cached: tuple, request: Request) -> Response:
+    body, etag = cached
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/{quiz_id}", response_model=schemas.QuizDetail)
+def get_quiz(quiz_id: int, request: Request, db: Session = Depends(get_read_db)):
+    # The serialised body is cached per quiz id (dropped on edits), so
+    # conditional requests are answered before any DB or JSON work.
+    cached = quiz_detail_cache.get(quiz_id)
+    if cached is None:
+        cached = _serialize_quiz_detail(db, quiz_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        quiz_detail_cache.set(quiz_id, cached)
+    return _quiz_detail_response(cached, request)
 
 
 @router.post("", response_model=schemas.QuizOut)
 def create_quiz(
     data: schemas.QuizCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
 ):
     topic = db.query(models.Topic).filter(models.Topic.id == data.topic_id).first()
     if not topic:
@@ -94,15 +137,43 @@ def create_quiz(
         )
         db.add(question)
 
-    db.commit()
-    db.refresh(quiz)
-
-    return schemas.QuizOut(
+    out = schemas.QuizOut(
         id=quiz.id,
         title=quiz.title,
         topic_id=quiz.topic_id,
-        topic=quiz.topic,
+        topic=topic,
         difficulty_level=quiz.difficulty_level,
         description=quiz.description,
-        question_count=len(quiz.questions),
+        question_count=len(data.questions),
     )
+    db.commit()
+    catalog.bump()
+    return out
+
+
+# ── Async variants (used when DATABASE_URL names an async driver) ─────
+async_router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
+
+
+@async_router.get("", response_model=List[schemas.QuizOut], name="list_quizzes")
+async def list_quizzes_async(
+    topic_id: Optional[int] = Query(None),
+    difficulty: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await db.run_sync(_find_quizzes, topic_id, difficulty)
+
+
+@async_router.get("/{quiz_id}", response_model=schemas.QuizDetail, name="get_quiz")
+async def get_quiz_async(quiz_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    cached = quiz_detail_cache.get(quiz_id)
+    if cached is None:
+        cached = await db.run_sync(_serialize_quiz_detail, quiz_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        quiz_detail_cache.set(quiz_id, cached)
+    return _quiz_detail_response(cached, request)
+
+
+# Quiz authoring is rare; it keeps the sync session in both modes
+async_router.add_api_route("", create_quiz, methods=["POST"], response_model=schemas.QuizOut)
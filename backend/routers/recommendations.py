@@ -1,100 +1,230 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from database import SessionLocal, get_async_db, get_async_read_db, get_read_db
+from auth import get_current_identity, get_current_identity_async
+from cache import TTLCache, recommendation_cache
+from catalog import catalog
+from config import get_settings
 from ml.recommender import generate_recommendation
+from pagination import keyset_page, set_next_cursor
+from writers import recommendation_writer
 import models
 import schemas
+import stats
 
+settings = get_settings()
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
+# student_id → (signature, created_at) of the last recommendation this
+# process queued for the write-behind writer and may not have flushed yet
+_latest_queued = TTLCache(
+    "recommendations_latest",
+    maxsize=settings.recommendation_cache_size,
+    ttl_s=settings.recommendation_cache_ttl_s,
+)
 
-@router.get("/{student_id}", response_model=schemas.RecommendationOut)
-def get_recommendation(
-    student_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    user = db.query(models.User).filter(models.User.id == student_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Student not found")
 
-    attempts = (
-        db.query(models.QuizAttempt)
-        .filter(models.QuizAttempt.user_id == student_id)
-        .all()
+def _signature(rec: dict) -> tuple:
+    return (
+        rec["recommended_topic_id"],
+        rec["current_level"],
+        rec["difficulty_adjustment"],
+        rec["reasoning"],
     )
 
-    # Aggregate by topic
-    topic_data: dict = {}
-    for attempt in attempts:
-        tid = attempt.quiz.topic_id
-        tname = attempt.quiz.topic.name
-        if tid not in topic_data:
-            topic_data[tid] = {"topic_id": tid, "topic_name": tname, "scores": [], "attempt_count": 0}
-        topic_data[tid]["scores"].append(attempt.score)
-        topic_data[tid]["attempt_count"] += 1
 
+def _persist_recommendation(
+    db: Session, student_id: int, rec: dict, write_db: Optional[Session] = None
+) -> datetime:
+    """
+    Record a freshly generated recommendation and return its created_at.
+    With RECOMMENDATION_DEDUPE on, a result identical to the student's latest
+    recommendation (the newest row in the database, or one this process has
+    queued but not yet flushed) isn't stored again and its created_at is
+    returned.
+    With RECOMMENDATION_WRITE_BEHIND on, the row goes to the bulk writer;
+    otherwise it is inserted through `write_db`, or a short-lived writer
+    session when `db` is a read session.
+    """
+    signature = _signature(rec)
+    if settings.recommendation_dedupe:
+        # Checked against the database every time (an indexed lookup): other
+        # workers and the nightly refresh write rows this process never sees
+        row = (
+            db.query(
+                models.Recommendation.recommended_topic_id,
+                models.Recommendation.current_level,
+                models.Recommendation.difficulty_adjustment,
+                models.Recommendation.reasoning,
+                models.Recommendation.created_at,
+            )
+            .filter(models.Recommendation.user_id == student_id)
+            .order_by(models.Recommendation.created_at.desc(), models.Recommendation.id.desc())
+            .first()
+        )
+        latest = (tuple(row[:4]), row.created_at) if row is not None else None
+        queued = _latest_queued.get(student_id)
+        if queued is not None and (latest is None or queued[1] > latest[1]):
+            latest = queued
+        if latest is not None and latest[0] == signature:
+            return latest[1]
+
+    created_at = datetime.utcnow()
+    values = {
+        "user_id": student_id,
+        "recommended_topic_id": rec["recommended_topic_id"],
+        "current_level": rec["current_level"],
+        "difficulty_adjustment": rec["difficulty_adjustment"],
+        "reasoning": rec["reasoning"],
+        "created_at": created_at,
+    }
+    if settings.recommendation_write_behind:
+        recommendation_writer.submit(values)
+        _latest_queued.set(student_id, (signature, created_at))
+    elif write_db is not None:
+        write_db.execute(insert(models.Recommendation), [values])
+        write_db.commit()
+    else:
+        with SessionLocal() as write_db:
+            write_db.execute(insert(models.Recommendation), [values])
+            write_db.commit()
+    return created_at
+
+
+def _get_recommendation(
+    db: Session, student_id: int, write_db: Optional[Session] = None
+) -> schemas.RecommendationOut:
+    user = db.query(models.User).filter(models.User.id == student_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    topic_stats = stats.get_user_topic_stats(db, student_id)
     attempts_summary = [
         {
-            "topic_id": v["topic_id"],
-            "topic_name": v["topic_name"],
-            "avg_score": sum(v["scores"]) / len(v["scores"]),
-            "attempt_count": v["attempt_count"],
+            "topic_id": s.topic_id,
+            "topic_name": s.topic_name,
+            "mastery": mastery,
+            "mastery_weight": weight,
+            "attempt_count": s.attempt_count,
+            "time_sum": s.time_sum,
         }
-        for v in topic_data.values()
+        for s, (mastery, weight) in zip(topic_stats, stats.mastery_terms(topic_stats))
     ]
 
-    all_topics_raw = db.query(models.Topic).all()
-    all_topics = [{"id": t.id, "name": t.name} for t in all_topics_raw]
+    all_topics = catalog.get(db).topic_refs
 
     rec = generate_recommendation(student_id, attempts_summary, all_topics)
 
-    # Persist recommendation
-    rec_row = models.Recommendation(
-        user_id=student_id,
-        recommended_topic_id=rec["recommended_topic_id"],
-        current_level=rec["current_level"],
-        difficulty_adjustment=rec["difficulty_adjustment"],
-        reasoning=rec["reasoning"],
-    )
-    db.add(rec_row)
-    db.commit()
-    db.refresh(rec_row)
+    created_at = _persist_recommendation(db, student_id, rec, write_db)
 
-    return schemas.RecommendationOut(
+    out = schemas.RecommendationOut(
         student_id=student_id,
         current_level=rec["current_level"],
         recommended_topic=rec["recommended_topic"],
         recommended_topic_id=rec["recommended_topic_id"],
         difficulty_adjustment=rec["difficulty_adjustment"],
         reasoning=rec["reasoning"],
-        created_at=rec_row.created_at,
+        created_at=created_at,
     )
+    recommendation_cache.set(student_id, out)
+    return out
 
 
-@router.get("/history/{student_id}")
-def get_recommendation_history(
-    student_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-):
-    history = (
-        db.query(models.Recommendation)
-        .filter(models.Recommendation.user_id == student_id)
-        .order_by(models.Recommendation.created_at.desc())
-        .limit(10)
-        .all()
+@router.get("/cache/stats")
+def get_recommendation_cache_stats(current_user: schemas.UserIdentity = Depends(get_current_identity)):
+    return recommendation_cache.stats()
+
+
+def _get_recommendation_history(
+    db: Session, student_id: int, cursor: Optional[str], limit: int
+) -> Tuple[List[dict], Optional[str]]:
+    rec = models.Recommendation
+    # Join the topic name in the same query instead of lazy-loading r.topic per row
+    history, next_cursor = keyset_page(
+        db.query(rec, models.Topic.name)
+        .join(models.Topic, models.Topic.id == rec.recommended_topic_id)
+        .filter(rec.user_id == student_id),
+        rec.created_at,
+        rec.id,
+        cursor,
+        limit,
+        key=lambda row: (row[0].created_at, row[0].id),
     )
-    return [
+    items = [
         {
             "id": r.id,
             "current_level": r.current_level,
-            "recommended_topic": r.topic.name,
+            "recommended_topic": topic_name,
             "difficulty_adjustment": r.difficulty_adjustment,
             "reasoning": r.reasoning,
             "created_at": r.created_at,
         }
-        for r in history
+        for r, topic_name in history
     ]
+    return items, next_cursor
+
+
+@router.get("/{student_id}", response_model=schemas.RecommendationOut)
+def get_recommendation(
+    student_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    cached = recommendation_cache.get(student_id)
+    if cached is not None:
+        return cached
+    return _get_recommendation(db, student_id)
+
+
+@router.get("/history/{student_id}")
+def get_recommendation_history(
+    student_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.recommendation_history_page_size, ge=1, le=settings.page_size_max),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
+):
+    # Newest first; the next page's cursor is returned in X-Next-Cursor
+    items, next_cursor = _get_recommendation_history(db, student_id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+# ── Async variants (used when DATABASE_URL names an async driver) ─────
+async_router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
+
+
+@async_router.get("/{student_id}", response_model=schemas.RecommendationOut, name="get_recommendation")
+async def get_recommendation_async(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    cached = recommendation_cache.get(student_id)
+    if cached is not None:
+        return cached
+    # The async engine never takes the write lock up front, so this session
+    # can also store the row when write-behind is off
+    return await db.run_sync(lambda session: _get_recommendation(session, student_id, session))
+
+
+async_router.add_api_route("/cache/stats", get_recommendation_cache_stats, methods=["GET"])
+
+
+@async_router.get("/history/{student_id}", name="get_recommendation_history")
+async def get_recommendation_history_async(
+    student_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.recommendation_history_page_size, ge=1, le=settings.page_size_max),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: schemas.UserIdentity = Depends(get_current_identity_async),
+):
+    items, next_cursor = await db.run_sync(_get_recommendation_history, student_id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return items
@@ -1,8 +1,11 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from database import get_db, get_read_db
+from auth import get_current_identity
+from cache import recommendation_cache
+from catalog import catalog
+from fastjson import FastJSONResponse
 import models
 import schemas
 
@@ -10,26 +13,29 @@ router = APIRouter(prefix="/topics", tags=["Topics"])
 
 
 @router.get("", response_model=List[schemas.TopicOut])
-def list_topics(db: Session = Depends(get_db)):
-    return db.query(models.Topic).all()
+def list_topics(db: Session = Depends(get_read_db)):
+    return FastJSONResponse(catalog.get(db).topics_json())
 
 
 @router.get("/{topic_id}", response_model=schemas.TopicOut)
-def get_topic(topic_id: int, db: Session = Depends(get_db)):
-    topic = db.query(models.Topic).filter(models.Topic.id == topic_id).first()
+def get_topic(topic_id: int, db: Session = Depends(get_read_db)):
+    topic = catalog.get(db).topics_by_id.get(topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return topic
+    return FastJSONResponse(topic)
 
 
 @router.post("", response_model=schemas.TopicOut)
 def create_topic(
     data: schemas.TopicCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.UserIdentity = Depends(get_current_identity),
 ):
     topic = models.Topic(**data.model_dump())
     db.add(topic)
     db.commit()
     db.refresh(topic)
+    catalog.bump()
+    # A new topic can become the "next unattempted topic" for anyone
+    recommendation_cache.clear()
     return topic
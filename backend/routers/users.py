@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database import get_db
-from auth import hash_password, verify_password, create_access_token, get_current_user
+from database import get_db, get_read_db
+from auth import hash_password_offloaded, verify_password_offloaded, create_access_token, get_current_identity
 import models
 import schemas
 
@@ -10,17 +11,24 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=schemas.Token)
 def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user_data.email).first()
+    existing = db.query(models.User.id).filter(models.User.email == user_data.email).first()
+    # End the (write-locking) transaction before the bcrypt wait; the insert
+    # below starts a fresh one
+    db.rollback()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = models.User(
         name=user_data.name,
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=hash_password_offloaded(user_data.password),
     )
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:  # registered concurrently while we were hashing
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
     db.refresh(user)
 
     token = create_access_token({"sub": str(user.id)})
@@ -28,9 +36,11 @@ def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(credentials: schemas.LoginRequest, db: Session = Depends(get_db)):
+def login(credentials: schemas.LoginRequest, db: Session = Depends(get_read_db)):
     user = db.query(models.User).filter(models.User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    # Return the connection before the bcrypt wait; loaded attributes stay readable
+    db.close()
+    if not user or not verify_password_offloaded(credentials.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     token = create_access_token({"sub": str(user.id)})
@@ -38,5 +48,5 @@ def login(credentials: schemas.LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.UserOut)
-def get_me(current_user: models.User = Depends(get_current_user)):
+def get_me(current_user: schemas.UserIdentity = Depends(get_current_identity)):
     return current_user
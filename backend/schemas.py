@@ -1,6 +1,6 @@
-from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime, timezone
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 
 # ── Auth ──────────────────────────────────────────────────────────────
@@ -20,6 +20,19 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+class UserIdentity(BaseModel):
+    """Authenticated-user snapshot cached per token; enough for most routes."""
+    id: int
+    name: str
+    email: str
+    is_active: bool = True
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -49,10 +62,20 @@ class TopicOut(BaseModel):
 
 
 # ── Questions ─────────────────────────────────────────────────────────
+# An option index; bounded so scoring can pack answers into a fixed-width array
+OptionIndex = Annotated[int, Field(ge=0, le=255)]
+
+
 class QuestionCreate(BaseModel):
     text: str
-    options: List[str] = Field(..., min_length=2)
-    correct_answer: int  # index 0-based
+    options: List[str] = Field(..., min_length=2, max_length=256)  # indices must fit OptionIndex
+    correct_answer: OptionIndex  # index 0-based
+
+    @model_validator(mode="after")
+    def _answer_in_options(self) -> "QuestionCreate":
+        if not 0 <= self.correct_answer < len(self.options):
+            raise ValueError(f"correct_answer must be between 0 and {len(self.options) - 1}")
+        return self
 
 
 class QuestionOut(BaseModel):
@@ -98,7 +121,7 @@ class QuizDetail(QuizOut):
 # ── Attempts ──────────────────────────────────────────────────────────
 class AttemptSubmit(BaseModel):
     quiz_id: int
-    answers: List[int]          # user's chosen option index per question
+    answers: List[OptionIndex]  # user's chosen option index per question
     time_taken_s: int = 0
 
 
@@ -115,11 +138,44 @@ class AttemptOut(BaseModel):
         from_attributes = True
 
 
+class AttemptBatchItem(AttemptSubmit):
+    attempted_at: Optional[datetime] = None  # when taken offline; defaults to receipt time
+
+    @field_validator("attempted_at")
+    @classmethod
+    def _naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Stored timestamps are naive UTC; naive input is taken to be UTC already
+        if value is not None and value.tzinfo is not None:
+            try:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            except OverflowError:
+                raise ValueError("attempted_at is out of range")
+        return value
+
+
+class AttemptBatchSubmit(BaseModel):
+    attempts: List[AttemptBatchItem]
+
+
+class AttemptBatchResult(BaseModel):
+    index: int                  # position in the submitted list
+    ok: bool
+    attempt: Optional[AttemptOut] = None
+    error: Optional[str] = None
+
+
+class AttemptBatchOut(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[AttemptBatchResult]
+
+
 # ── Progress ──────────────────────────────────────────────────────────
 class TopicProgress(BaseModel):
     topic_id: int
     topic_name: str
     avg_score: float
+    mastery: float              # time-decayed average score; recent attempts weigh most
     attempts: int
 
 
@@ -127,11 +183,23 @@ class ProgressOut(BaseModel):
     student_id: int
     total_attempts: int
     avg_score: float
-    current_level: str
+    mastery: float
+    current_level: str          # from mastery
     topic_progress: List[TopicProgress]
     recent_attempts: List[AttemptOut]
 
 
+# ── Analytics ─────────────────────────────────────────────────────────
+class PercentileOut(BaseModel):
+    scope: str                  # quiz / topic
+    scope_id: int
+    attempts: int               # attempts in the distribution
+    score: Optional[float] = None
+    score_percentile: Optional[float] = None  # % of attempts scoring lower
+    time_taken_s: Optional[int] = None
+    time_percentile: Optional[float] = None   # % of attempts finishing faster
+
+
 # ── Recommendations ───────────────────────────────────────────────────
 class RecommendationOut(BaseModel):
     student_id: int
@@ -0,0 +1,116 @@
+"""
+Answer keys and vectorised attempt scoring.
+
+An AnswerKey is a quiz's correct option indices as a compact integer array
+(question id order), so scoring a stack of submissions is a single array
+comparison instead of a walk over Question ORM objects. Keys are kept in
+answer_key_cache, so a warm submission fetches no question rows at all;
+ORM changes to a quiz or its questions evict the quiz's key once they commit.
+
+numpy is imported on first use rather than at module import, so it stays
+off the API's startup path.
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from cache import answer_key_cache
+from database import call_after_commit
+import models
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AnswerKey(NamedTuple):
+    quiz_id: int
+    topic_id: int
+    correct: "np.ndarray"  # uint8 (the OptionIndex range), one entry per question
+
+    @property
+    def question_count(self) -> int:
+        return len(self.correct)
+
+
+def load_answer_keys(db: Session, quiz_ids: Iterable[int]) -> Dict[int, AnswerKey]:
+    """Fetch answer keys for many quizzes in one query; unknown ids are omitted."""
+    import numpy as np
+
+    quiz_ids = sorted(set(quiz_ids))
+    if not quiz_ids:
+        return {}
+    rows = db.execute(
+        select(models.Quiz.id, models.Quiz.topic_id, models.Question.correct_answer)
+        .outerjoin(models.Question, models.Question.quiz_id == models.Quiz.id)
+        .where(models.Quiz.id.in_(quiz_ids))
+        .order_by(models.Quiz.id, models.Question.id)
+    ).all()
+
+    grouped: Dict[int, tuple] = {}
+    for quiz_id, topic_id, correct_answer in rows:
+        entry = grouped.setdefault(quiz_id, (topic_id, []))
+        if correct_answer is not None:  # outer join row for a quiz without questions
+            entry[1].append(correct_answer)
+    keys = {}
+    for quiz_id, (topic_id, answers) in grouped.items():
+        correct = np.asarray(answers, dtype=np.uint8)
+        correct.flags.writeable = False  # shared between requests via the cache
+        keys[quiz_id] = AnswerKey(quiz_id, topic_id, correct)
+    return keys
+
+
+def get_answer_keys(db: Session, quiz_ids: Iterable[int]) -> Dict[int, AnswerKey]:
+    """Cached answer keys; misses are loaded together in one query."""
+    keys, missing = {}, []
+    for quiz_id in set(quiz_ids):
+        key = answer_key_cache.get(quiz_id)
+        if key is None:
+            missing.append(quiz_id)
+        else:
+            keys[quiz_id] = key
+    for quiz_id, key in load_answer_keys(db, missing).items():
+        answer_key_cache.set(quiz_id, key)
+        keys[quiz_id] = key
+    return keys
+
+
+def get_answer_key(db: Session, quiz_id: int) -> Optional[AnswerKey]:
+    return get_answer_keys(db, (quiz_id,)).get(quiz_id)
+
+
+def invalidate_answer_key(quiz_id: int) -> None:
+    answer_key_cache.invalidate(quiz_id)
+
+
+@event.listens_for(models.Question, "after_insert")
+@event.listens_for(models.Question, "after_update")
+@event.listens_for(models.Question, "after_delete")
+def _on_question_change(mapper, connection, question):
+    call_after_commit(question, invalidate_answer_key, question.quiz_id)
+
+
+@event.listens_for(models.Quiz, "after_update")
+@event.listens_for(models.Quiz, "after_delete")
+def _on_quiz_change(mapper, connection, quiz):
+    call_after_commit(quiz, invalidate_answer_key, quiz.id)
+
+
+def score_answers(key: AnswerKey, answers: List[List[int]]) -> "np.ndarray":
+    """
+    Correct-answer counts for a batch of submissions to one quiz.
+    Every submission must have exactly key.question_count answers.
+    """
+    import numpy as np
+
+    submitted = np.asarray(answers, dtype=np.int64).reshape(len(answers), key.question_count)
+    return (submitted == key.correct).sum(axis=1)
+
+
+def validate_answers(key: Optional[AnswerKey], answers: List[int]) -> Optional[str]:
+    """Return the error a single submission would get, or None if it can be scored."""
+    if key is None:
+        return "Quiz not found"
+    if key.question_count == 0:
+        return "Quiz has no questions"
+    if len(answers) != key.question_count:
+        return f"Expected {key.question_count} answers, got {len(answers)}"
+    return None
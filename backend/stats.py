@@ -0,0 +1,324 @@
+"""
+Per-user, per-topic performance aggregates.
+
+`user_topic_stats` holds running totals (score sum, attempt count, time
+sum, last attempt) so read paths touch O(topics) rows instead of
+re-averaging every attempt a student has made.
+
+Mastery is a time-decayed average score: an attempt's weight halves every
+mastery_half_life_days. Each row keeps mastery_sum = Σ score·w and
+mastery_weight = Σ w, with every weight taken relative to mastery_at (the
+newest attempt folded in, in days since MASTERY_EPOCH):
+w = 2^((t - mastery_at) / half-life) <= 1. Folding in an attempt rescales
+both sides to the later of the two references inside the same upsert as
+the totals, so updates stay O(1), atomic and order-independent, and
+weights can only underflow towards 0, never overflow. mastery =
+mastery_sum / mastery_weight only moves when new attempts do.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import Float, case, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from config import get_settings
+import models
+
+settings = get_settings()
+
+MASTERY_EPOCH = datetime(2024, 1, 1)  # origin of mastery_at; only differences are exponentiated
+
+_State = Tuple[float, float, float]  # mastery_sum, mastery_weight, mastery_at
+
+
+def mastery_days(at: datetime) -> float:
+    """Days since MASTERY_EPOCH; aware datetimes are converted to naive UTC first."""
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return (at - MASTERY_EPOCH).total_seconds() / 86400
+
+
+def _decay(days: float) -> float:
+    """Weight left after `days` (>= 0) have passed."""
+    return 2.0 ** (-days / settings.mastery_half_life_days)
+
+
+def _merge(a: _State, b: _State) -> _State:
+    ref = max(a[2], b[2])
+    fa, fb = _decay(ref - a[2]), _decay(ref - b[2])
+    return a[0] * fa + b[0] * fb, a[1] * fa + b[1] * fb, ref
+
+
+def mastery_terms(rows: Sequence) -> List[Tuple[float, float]]:
+    """
+    (mastery, weight) for each of one user's rows (anything with score_sum,
+    attempt_count, mastery_sum, mastery_weight and mastery_at). Weights are
+    rescaled to the user's newest mastery_at so they can be summed across
+    topics. Rows not yet backfilled fall back to the plain average, weighted
+    by attempt count.
+    """
+    ref = max((r.mastery_at for r in rows if r.mastery_weight > 0), default=0.0)
+    terms = []
+    for r in rows:
+        if r.mastery_weight > 0:
+            terms.append((r.mastery_sum / r.mastery_weight, r.mastery_weight * _decay(ref - r.mastery_at)))
+        else:
+            terms.append((r.score_sum / r.attempt_count if r.attempt_count else 0.0, float(r.attempt_count)))
+    return terms
+
+
+def overall_mastery(terms: Iterable[Tuple[float, float]]) -> float:
+    """Weighted mean of mastery_terms() across topics; 0 without attempts."""
+    total = weight_sum = 0.0
+    for mastery, weight in terms:
+        total += mastery * weight
+        weight_sum += weight
+    return total / weight_sum if weight_sum > 0 else 0.0
+
+
+def _upsert_stmt(db: Session):
+    """Build an INSERT … ON CONFLICT DO UPDATE for the dialect in use, if any."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+
+    stat = models.UserTopicStat
+    stmt = dialect_insert(stat)
+    return stmt.on_conflict_do_update(
+        index_elements=[stat.user_id, stat.topic_id],
+        set_={
+            "score_sum": stat.score_sum + stmt.excluded.score_sum,
+            "attempt_count": stat.attempt_count + stmt.excluded.attempt_count,
+            "time_sum": stat.time_sum + stmt.excluded.time_sum,
+            **_mastery_set(stmt.excluded.mastery_sum, stmt.excluded.mastery_weight, stmt.excluded.mastery_at),
+            "last_attempt_at": _latest(stmt.excluded.last_attempt_at),
+        },
+    )
+
+
+def _latest(last_attempt_at):
+    """The later of the stored and incoming last_attempt_at."""
+    stat = models.UserTopicStat
+    # Offline-synced attempts can be older than the latest one seen
+    return case(
+        (stat.last_attempt_at.is_(None), last_attempt_at),
+        (last_attempt_at > stat.last_attempt_at, last_attempt_at),
+        else_=stat.last_attempt_at,
+    )
+
+
+def _mastery_set(mastery_sum, mastery_weight, mastery_at) -> dict:
+    """SET clauses folding a (sum, weight, at) state into a row, rescaled to the later reference."""
+    stat = models.UserTopicStat
+    half_life = settings.mastery_half_life_days
+    # A row with attempts but no weight predates the mastery columns and
+    # hasn't been backfilled: seed it with its plain average, as reads do,
+    # rather than letting the new attempt replace its history
+    seeded = stat.mastery_weight > 0
+    old_sum = case((seeded, stat.mastery_sum), else_=stat.score_sum)
+    old_weight = case((seeded, stat.mastery_weight), else_=cast(stat.attempt_count, Float))
+    old_at = case((seeded, stat.mastery_at), else_=mastery_at)
+    ref = case((mastery_at > old_at, mastery_at), else_=old_at)
+    # Both exponents are <= 0; SQLite connections get power() from database.py
+    old = func.power(2.0, (old_at - ref) / half_life)
+    new = func.power(2.0, (mastery_at - ref) / half_life)
+    return {
+        "mastery_sum": old_sum * old + mastery_sum * new,
+        "mastery_weight": old_weight * old + mastery_weight * new,
+        "mastery_at": ref,
+    }
+
+
+def _apply(db: Session, rows: List[dict]) -> None:
+    stmt = _upsert_stmt(db)
+    if stmt is not None:
+        db.execute(stmt, rows)
+        return
+
+    stat = models.UserTopicStat
+    for values in rows:
+        updated = (
+            db.query(stat)
+            .filter(stat.user_id == values["user_id"], stat.topic_id == values["topic_id"])
+            .update(
+                {
+                    stat.score_sum: stat.score_sum + values["score_sum"],
+                    stat.attempt_count: stat.attempt_count + values["attempt_count"],
+                    stat.time_sum: stat.time_sum + values["time_sum"],
+                    **{
+                        getattr(stat, name): value for name, value in _mastery_set(
+                            values["mastery_sum"], values["mastery_weight"], values["mastery_at"],
+                        ).items()
+                    },
+                    stat.last_attempt_at: _latest(values["last_attempt_at"]),
+                },
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            db.add(stat(**values))
+
+
+def record_attempt(db: Session, attempt: models.QuizAttempt, topic_id: int) -> None:
+    """
+    Fold a new attempt into the user's topic totals.
+    Runs in the caller's transaction; the caller commits.
+    """
+    attempted_at = attempt.attempted_at or datetime.utcnow()
+    _apply(db, [{
+        "user_id": attempt.user_id,
+        "topic_id": topic_id,
+        "score_sum": attempt.score,
+        "attempt_count": 1,
+        "time_sum": attempt.time_taken_s or 0,
+        "mastery_sum": attempt.score,
+        "mastery_weight": 1.0,
+        "mastery_at": mastery_days(attempted_at),
+        "last_attempt_at": attempted_at,
+    }])
+
+
+def record_attempts(db: Session, user_id: int, attempts: Iterable[Tuple[int, float, int, datetime]]) -> None:
+    """
+    Fold many of one user's attempts, given as (topic_id, score, time_taken_s,
+    attempted_at), into their totals with one upsert row per topic.
+    Runs in the caller's transaction; the caller commits.
+    """
+    totals: Dict[int, dict] = {}
+    for topic_id, score, time_taken_s, attempted_at in attempts:
+        state = (score, 1.0, mastery_days(attempted_at))
+        row = totals.get(topic_id)
+        if row is None:
+            totals[topic_id] = {
+                "user_id": user_id,
+                "topic_id": topic_id,
+                "score_sum": score,
+                "attempt_count": 1,
+                "time_sum": time_taken_s or 0,
+                "mastery_sum": state[0],
+                "mastery_weight": state[1],
+                "mastery_at": state[2],
+                "last_attempt_at": attempted_at,
+            }
+        else:
+            row["score_sum"] += score
+            row["attempt_count"] += 1
+            row["time_sum"] += time_taken_s or 0
+            row["mastery_sum"], row["mastery_weight"], row["mastery_at"] = _merge(
+                (row["mastery_sum"], row["mastery_weight"], row["mastery_at"]), state
+            )
+            row["last_attempt_at"] = max(row["last_attempt_at"], attempted_at)
+    if totals:
+        _apply(db, list(totals.values()))
+
+
+def get_user_topic_stats(db: Session, user_id: int) -> List:
+    """
+    Return one row per attempted topic, ordered by topic id, with:
+    topic_id, topic_name, score_sum, attempt_count, time_sum, mastery_sum,
+    mastery_weight, mastery_at, last_attempt_at
+    """
+    stat = models.UserTopicStat
+    return db.execute(
+        select(
+            stat.topic_id,
+            models.Topic.name.label("topic_name"),
+            stat.score_sum,
+            stat.attempt_count,
+            stat.time_sum,
+            stat.mastery_sum,
+            stat.mastery_weight,
+            stat.mastery_at,
+            stat.last_attempt_at,
+        )
+        .join(models.Topic, models.Topic.id == stat.topic_id)
+        .where(stat.user_id == user_id, stat.attempt_count > 0)
+        .order_by(stat.topic_id)
+    ).all()
+
+
+def get_user_totals(db: Session, user_id: int) -> Tuple[int, int, float]:
+    """Return (attempt_count, time_sum, overall mastery) over all of a user's topics."""
+    stat = models.UserTopicStat
+    rows = db.execute(
+        select(
+            stat.score_sum, stat.attempt_count, stat.time_sum,
+            stat.mastery_sum, stat.mastery_weight, stat.mastery_at,
+        ).where(stat.user_id == user_id, stat.attempt_count > 0)
+    ).all()
+    return (
+        sum(r.attempt_count for r in rows),
+        sum(r.time_sum for r in rows),
+        overall_mastery(mastery_terms(rows)),
+    )
+
+
+def backfill(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild aggregates from quiz_attempts with a single INSERT … SELECT,
+    then fill in the mastery terms (see _backfill_mastery). Limited to one
+    user when `user_id` is given. Returns rows written.
+    """
+    stat = models.UserTopicStat
+    attempt = models.QuizAttempt
+    quiz = models.Quiz
+
+    clear = delete(stat)
+    source = (
+        select(
+            attempt.user_id,
+            quiz.topic_id,
+            func.sum(attempt.score),
+            func.count(attempt.id),
+            func.coalesce(func.sum(attempt.time_taken_s), 0),
+            func.max(attempt.attempted_at),
+        )
+        .join(quiz, quiz.id == attempt.quiz_id)
+        .group_by(attempt.user_id, quiz.topic_id)
+    )
+    if user_id is not None:
+        clear = clear.where(stat.user_id == user_id)
+        source = source.where(attempt.user_id == user_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(stat).from_select(
+            ["user_id", "topic_id", "score_sum", "attempt_count", "time_sum", "last_attempt_at"],
+            source,
+        )
+    )
+    _backfill_mastery(db, user_id)
+    return result.rowcount
+
+
+def _backfill_mastery(db: Session, user_id: Optional[int] = None, batch_size: int = 50_000) -> None:
+    """
+    Recompute the mastery columns from quiz_attempts. Attempts are streamed
+    and folded together in Python (date arithmetic differs per dialect),
+    then written back with one bulk UPDATE by primary key. Also run this
+    after changing mastery_half_life_days.
+    """
+    attempt = models.QuizAttempt
+    source = (
+        select(attempt.user_id, models.Quiz.topic_id, attempt.score, attempt.attempted_at)
+        .join(models.Quiz, models.Quiz.id == attempt.quiz_id)
+        .execution_options(yield_per=batch_size)
+    )
+    if user_id is not None:
+        source = source.where(attempt.user_id == user_id)
+
+    states: Dict[Tuple[int, int], _State] = {}
+    now = datetime.utcnow()
+    for uid, topic_id, score, attempted_at in db.execute(source):
+        state = (score, 1.0, mastery_days(attempted_at or now))
+        key = (uid, topic_id)
+        states[key] = _merge(states[key], state) if key in states else state
+
+    rows = [
+        {"user_id": uid, "topic_id": topic_id, "mastery_sum": total, "mastery_weight": weight, "mastery_at": at}
+        for (uid, topic_id), (total, weight, at) in states.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.execute(update(models.UserTopicStat), rows[start:start + batch_size])
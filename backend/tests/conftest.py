@@ -0,0 +1,55 @@
+"""
+Shared fixtures. Settings are read when the backend modules are imported,
+so the environment is pointed at a throwaway SQLite database (migrated and
+seeded by the app's startup handler) before any of them load.
+"""
+import os
+import tempfile
+
+TMP_DIR = tempfile.mkdtemp(prefix="learning_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ["DATABASE_READ_URL"] = ""
+os.environ["CLUSTER_MODEL_PATH"] = os.path.join(TMP_DIR, "student_clusters.json")
+# Store recommendations inline so every statement runs on the request's thread
+os.environ["RECOMMENDATION_WRITE_BEHIND"] = "false"
+
+import itertools
+import pytest
+from fastapi.testclient import TestClient
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def make_student(client):
+    """Factory: a new student with `attempts` submitted attempts, spread over every seeded quiz."""
+    import models
+    from auth import create_access_token
+    from database import SessionLocal
+
+    def make(attempts: int = 0):
+        with SessionLocal() as db:
+            user = models.User(name="Test Student", email=f"student{next(_emails)}@example.com", hashed_password="x")
+            db.add(user)
+            db.commit()
+            user_id = user.id
+            quizzes = [(q.id, len(q.questions)) for q in db.query(models.Quiz).order_by(models.Quiz.id)]
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+        if attempts:
+            items = [
+                {"quiz_id": quiz_id, "answers": [i % 4] * count, "time_taken_s": 30 + i}
+                for i, (quiz_id, count) in zip(range(attempts), itertools.cycle(quizzes))
+            ]
+            response = client.post("/attempts/batch", json={"attempts": items}, headers=headers)
+            assert response.status_code == 200 and response.json()["accepted"] == attempts
+        return user_id, headers
+
+    return make
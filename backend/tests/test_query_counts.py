@@ -0,0 +1,52 @@
+"""
+The per-student read endpoints must run a fixed number of SQL statements
+however many attempts the student has made (no N+1 lazy loads).
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from cache import recommendation_cache
+
+ATTEMPT_COUNTS = (0, 5, 40)
+
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def _measure(client, path: str, headers: dict, user_id: int) -> List[str]:
+    # The first call warms the identity, catalog and dedupe caches the same
+    # way for every student; the measured call then misses only the
+    # recommendation cache
+    assert client.get(path, headers=headers).status_code == 200
+    recommendation_cache.invalidate(user_id)
+    with count_statements() as statements:
+        assert client.get(path, headers=headers).status_code == 200
+    return statements
+
+
+def _assert_constant(client, make_student, path: str) -> None:
+    counts = {}
+    for attempts in ATTEMPT_COUNTS:
+        user_id, headers = make_student(attempts)
+        counts[attempts] = len(_measure(client, path.format(user_id=user_id), headers, user_id))
+    assert len(set(counts.values())) == 1, f"statements per request by attempt count: {counts}"
+
+
+def test_progress_statement_count_is_constant(client, make_student):
+    _assert_constant(client, make_student, "/progress/{user_id}")
+
+
+def test_recommendation_statement_count_is_constant(client, make_student):
+    _assert_constant(client, make_student, "/recommendations/{user_id}")
@@ -0,0 +1,20 @@
+"""
+Every hot query must be answered from an index on a migrated, seeded
+database; a migration that drops or forgets an index fails here.
+"""
+import pytest
+from database import read_engine
+import query_plans
+
+
+@pytest.fixture(scope="module")
+def plans(client, make_student):
+    make_student(attempts=20)  # so the stats and distribution tables aren't empty
+    with read_engine.connect() as conn:
+        return {r.name: r for r in query_plans.check_query_plans(conn)}
+
+
+@pytest.mark.parametrize("name", list(query_plans.HOT_QUERIES))
+def test_hot_query_uses_an_index(plans, name):
+    result = plans[name]
+    assert not result.full_scans, f"{name} scans {', '.join(result.full_scans)}:\n" + "\n".join(result.plan)
@@ -0,0 +1,28 @@
+"""
+Startup stays cheap: importing main and entering its lifespan in a
+fresh process must not pull in numpy/scipy/sklearn, and a warm start must
+fit the budget (STARTUP_BUDGET_S, default startup_time.WARM_BUDGET_S).
+"""
+import os
+import pytest
+from benchmarks import startup_time
+
+WARM_RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def reports(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('startup') / 'startup.db'}"
+    cold = startup_time.spawn(url)  # migrates and seeds
+    warm = [startup_time.spawn(url) for _ in range(WARM_RUNS)]
+    return {"cold": startup_time.summarise([cold]), "warm": startup_time.summarise(warm)}
+
+
+@pytest.mark.parametrize("flavour", ["cold", "warm"])
+def test_startup_skips_heavy_modules(reports, flavour):
+    assert reports[flavour]["heavy_modules"] == []
+
+
+def test_warm_startup_within_budget(reports):
+    budget = float(os.environ.get("STARTUP_BUDGET_S", startup_time.WARM_BUDGET_S))
+    assert reports["warm"]["wall_p50_s"] <= budget, reports["warm"]
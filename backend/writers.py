@@ -0,0 +1,96 @@
+"""
+Write-behind bulk inserts.
+
+BulkWriter buffers row dicts for one table and inserts them with a single
+executemany from a background thread, either every `flush_interval_s` or
+once `max_batch` rows are waiting. Used for append-only logs where a
+request shouldn't pay for its own INSERT + COMMIT.
+"""
+import logging
+import threading
+from typing import Dict, List
+from sqlalchemy import insert
+from config import get_settings
+from database import SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    def __init__(self, model, flush_interval_s: float, max_batch: int):
+        self.model = model
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max_batch
+        self._pending: List[Dict] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self.rows_written = 0
+
+    def submit(self, row: Dict) -> None:
+        with self._cond:
+            self._pending.append(row)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"bulk-writer-{self.model.__tablename__}", daemon=True
+                )
+                self._thread.start()
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        if self._stopped:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval_s)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def flush(self) -> int:
+        """Insert everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._cond:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            db = SessionLocal()
+            try:
+                db.execute(insert(self.model), rows)
+                db.commit()
+                self.rows_written += len(rows)
+                return len(rows)
+            except Exception:
+                db.rollback()
+                logger.exception("Dropped %d %s rows after a failed bulk insert",
+                                 len(rows), self.model.__tablename__)
+                return 0
+            finally:
+                db.close()
+
+    def close(self) -> None:
+        """Stop the background thread after a final flush."""
+        with self._cond:
+            self._stopped = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+_settings = get_settings()
+
+recommendation_writer = BulkWriter(
+    models.Recommendation,
+    flush_interval_s=_settings.recommendation_flush_interval_s,
+    max_batch=_settings.recommendation_flush_batch,
+)
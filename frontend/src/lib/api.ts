@@ -41,7 +41,12 @@ export const quizzesApi = {
 export const attemptsApi = {
     submit: (quizId: number, answers: number[], timeTakenS: number) =>
         api.post('/attempts', { quiz_id: quizId, answers, time_taken_s: timeTakenS }),
-    my: () => api.get('/attempts/my'),
+    // One newest-first page; pass nextCursor back in for the next one
+    // (undefined on the last page)
+    my: async (cursor?: string, limit?: number) => {
+        const res = await api.get('/attempts/my', { params: { cursor, limit } });
+        return { items: res.data, nextCursor: res.headers['x-next-cursor'] as string | undefined };
+    },
 };
 
 // Progress